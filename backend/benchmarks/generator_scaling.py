@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Generator scaling benchmark for the Smart Classroom & Timetable Scheduler.
+
+Times TimetableGenerator.solve on synthetic departments of increasing size,
+once with the bitmask SlotOccupancy index and once with the original
+linear scan over already-placed entries, and prints a comparison table.
+
+Usage: python backend/benchmarks/generator_scaling.py [--sizes 5,10,20,40] [--repeat 3]
+           [--hours-per-subject 4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# server.py reads these at import time; the benchmark never talks to Mongo
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import SlotOccupancy, TimetableGenerator  # noqa: E402
+
+
+class LinearScanOccupancy(SlotOccupancy):
+    """Original conflict check: walk every placed entry for each candidate slot"""
+
+    def __init__(self, time_slots):
+        super().__init__()
+        self.time_slots = time_slots
+        self.entries = []
+        self.unavailable = {}
+
+    def limit_faculty(self, faculty_id, max_per_day, max_per_week, slots_per_day, num_days, unavailable=0):
+        self.unavailable[faculty_id] = unavailable
+        super().limit_faculty(faculty_id, max_per_day, max_per_week, slots_per_day, num_days, unavailable)
+
+    def is_free(self, batch_id, faculty_id, room_id, slot_index):
+        # Hour caps and unavailability come from SlotOccupancy, so both indexes place the same entries
+        blocked = self.faculty_capped.get(faculty_id, 0) | self.unavailable.get(faculty_id, 0)
+        if (blocked >> slot_index) & 1:
+            return False
+        slot = self.time_slots[slot_index]
+        for entry_batch, entry_faculty, entry_room, entry_slot in self.entries:
+            entry_slot = self.time_slots[entry_slot]
+            if (entry_slot.day == slot.day and entry_slot.start_time == slot.start_time and
+                (entry_batch == batch_id or entry_faculty == faculty_id or entry_room == room_id)):
+                return False
+        return True
+
+    def is_room_free(self, room_id, slot_index):
+        slot = self.time_slots[slot_index]
+        for _, _, entry_room, entry_slot in self.entries:
+            entry_slot = self.time_slots[entry_slot]
+            if entry_slot.day == slot.day and entry_slot.start_time == slot.start_time and entry_room == room_id:
+                return False
+        return True
+
+    def occupy(self, batch_id, faculty_id, room_id, slot_index):
+        super().occupy(batch_id, faculty_id, room_id, slot_index)
+        self.entries.append((batch_id, faculty_id, room_id, slot_index))
+
+    def release(self, batch_id, faculty_id, room_id, slot_index):
+        super().release(batch_id, faculty_id, room_id, slot_index)
+        self.entries.remove((batch_id, faculty_id, room_id, slot_index))
+
+
+def build_department(num_batches, subjects_per_batch=5, hours_per_subject=4):
+    """Synthetic department: one shared subject set, two faculty per subject, a room per batch"""
+    subjects = [
+        {"id": f"sub-{i}", "name": f"Subject {i}", "code": f"S{i:03d}",
+         "hours_per_week": hours_per_subject, "requires_lab": i % 5 == 4}
+        for i in range(subjects_per_batch)
+    ]
+    faculty = []
+    for i in range(num_batches * 2):
+        faculty.append({"id": f"fac-{i}", "name": f"Faculty {i}",
+                        "subjects": [subjects[i % subjects_per_batch]["id"]]})
+    rooms = [{"id": f"room-{i}", "name": f"Room {i}", "room_type": "Classroom", "capacity": 60}
+             for i in range(num_batches)]
+    rooms += [{"id": f"lab-{i}", "name": f"Lab {i}", "room_type": "Laboratory", "capacity": 30}
+              for i in range(max(1, num_batches // 4))]
+    batches = [{"id": f"batch-{i}", "name": f"Batch {i}", "student_count": 30 + i % 25,
+                "subjects": [s["id"] for s in subjects]}
+               for i in range(num_batches)]
+    return batches, subjects, faculty, rooms
+
+
+def time_solve(generator, data, occupancy_factory, repeat):
+    """Best wall time over ``repeat`` seeded solves, and the entries the last solve placed"""
+    best = None
+    entries = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        timetable = generator.solve("Benchmark", 1, *data, occupancy=occupancy_factory(), seed=0)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        entries = [(entry.batch_id, entry.subject_id, entry.faculty_id, entry.room_id, entry.day, entry.start_time)
+                   for entry in timetable.entries]
+    return best, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="5,10,20,40", help="comma-separated batch counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size (best is reported)")
+    parser.add_argument("--hours-per-subject", type=int, default=4,
+                        help="weekly hours of each of the 5 subjects (above 8 a batch no longer fits)")
+    args = parser.parse_args()
+
+    generator = TimetableGenerator()
+    # Keep the solver's own log lines out of the table
+    logging.getLogger("server").setLevel(logging.ERROR)
+
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        data = build_department(size, hours_per_subject=args.hours_per_subject)
+        linear, entries = time_solve(generator, data,
+                                     lambda: LinearScanOccupancy(generator.time_slots), args.repeat)
+        bitmask, bitmask_entries = time_solve(generator, data, lambda: None, args.repeat)
+        assert entries == bitmask_entries, "both conflict indexes must place the same entries"
+        rows.append((size, len(entries), linear, bitmask))
+
+    print(f"{'batches':>8} {'entries':>8} {'linear scan (ms)':>17} {'bitmask (ms)':>13} {'speedup':>8}")
+    for size, entries, linear, bitmask in rows:
+        print(f"{size:>8} {entries:>8} {linear * 1000:>17.1f} {bitmask * 1000:>13.1f} {linear / bitmask:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Load-test and benchmark suite for the Smart Classroom & Timetable Scheduler API.
+
+Drives the FastAPI app in-process through httpx, against mongomock-motor by
+default or a local mongod with --mongo-url (a throwaway database is created
+and dropped). Scenarios follow backend_test.py:
+
+  generate[BxSxR]       POST /timetables/generate for synthetic campuses of
+                        B batches x S subjects x R rooms, one seed per run
+  student_timetable     concurrent GET /student/timetable/{batch} (views)
+  student_timetable_live  the same with the materialized views dropped
+  assignments_batch     concurrent GET /assignments/batch/{batch}
+  timetables_list       concurrent GET /timetables (summaries)
+
+Every scenario reports p50/p95/p99 latency, requests per second and Mongo
+operations per request. Results can be saved as a JSON baseline and later
+runs compared against it; a p95 slowdown beyond --tolerance or any increase
+in queries per request counts as a regression and exits with status 1.
+
+Usage: python backend/benchmarks/load_test.py [--sizes 4x6x6,8x8x12,16x8x24]
+           [--requests 2000] [--concurrency 32] [--mongo-url mongodb://localhost:27017]
+           [--save-baseline baseline.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# server.py reads these at import time; the database is swapped out below
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from server import Assignment, Batch, Faculty, Room, Subject, SubjectType  # noqa: E402
+
+DEPARTMENT = "Benchmark"
+SEMESTER = 1
+HOURS_PER_SUBJECT = 3
+
+# Collection methods that cost one round trip to Mongo
+MONGO_OPERATIONS = {
+    "find", "find_one", "find_one_and_update", "find_one_and_delete", "aggregate", "distinct",
+    "count_documents", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write",
+}
+
+
+class CountingCollection:
+    """Motor collection proxy that counts every operation issued through it"""
+
+    def __init__(self, collection, counts):
+        self._collection = collection
+        self._counts = counts
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in MONGO_OPERATIONS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._counts[self._collection.name] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+class CountingDatabase:
+    """Motor database proxy; ``counts`` holds operations per collection since the last reset"""
+
+    def __init__(self, database):
+        self._database = database
+        self.counts = Counter()
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self.counts)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def reset(self) -> int:
+        total = sum(self.counts.values())
+        self.counts.clear()
+        return total
+
+
+def parse_size(size: str) -> tuple:
+    batches, subjects, rooms = (int(part) for part in size.lower().split("x"))
+    if subjects * HOURS_PER_SUBJECT > 42:
+        raise argparse.ArgumentTypeError(f"{size}: at most {42 // HOURS_PER_SUBJECT} subjects fit in a week")
+    return batches, subjects, rooms
+
+
+def build_campus(num_batches: int, num_subjects: int, num_rooms: int, department: str = DEPARTMENT,
+                 semester: int = SEMESTER, seed: int = 0) -> dict:
+    """Synthetic department where every batch takes every subject; every fifth subject and room is a lab"""
+    rng = random.Random(seed)
+    subjects = [
+        Subject(name=f"Subject {i}", code=f"BM{i:03d}", department=department, semester=semester,
+                subject_type=SubjectType.PRACTICAL if i % 5 == 4 else SubjectType.THEORY,
+                hours_per_week=HOURS_PER_SUBJECT, requires_lab=i % 5 == 4)
+        for i in range(num_subjects)
+    ]
+    # Enough faculty to cover each subject's weekly hours within the default weekly cap
+    faculty_per_subject = math.ceil(num_batches * HOURS_PER_SUBJECT / 24)
+    faculty = [
+        Faculty(name=f"Faculty {subject.code}-{i}", department=department, subjects=[subject.id])
+        for subject in subjects for i in range(faculty_per_subject)
+    ]
+    for subject in subjects:
+        subject.faculty_ids = [member.id for member in faculty if subject.id in member.subjects]
+    num_labs = max(1, num_rooms // 5)
+    rooms = [Room(name=f"Lab {i}", capacity=rng.randint(30, 70), room_type="Laboratory") for i in range(num_labs)]
+    rooms += [Room(name=f"Room {i}", capacity=rng.randint(40, 90), room_type="Classroom")
+              for i in range(max(1, num_rooms - num_labs))]
+    batches = [
+        Batch(name=f"Batch {i}", department=department, semester=semester,
+              student_count=rng.randint(30, 60), subjects=[subject.id for subject in subjects])
+        for i in range(num_batches)
+    ]
+    due = datetime.now(timezone.utc)
+    assignments = [
+        Assignment(title=f"Assignment {i}", description="Benchmark assignment", subject_id=subject.id,
+                   faculty_id=subject.faculty_ids[0], batch_id=batch.id, due_date=due + timedelta(days=i))
+        for batch in batches for i, subject in enumerate(subjects)
+    ]
+    return {"rooms": rooms, "faculty": faculty, "subjects": subjects, "batches": batches,
+            "assignments": assignments}
+
+
+async def load_campus(campus: dict):
+    """Replace the database contents with ``campus`` and drop every derived cache"""
+    for name in ("rooms", "faculty", "subjects", "batches", "assignments", "timetables", "timetable_entries",
+                 "active_timetables", "batch_timetable_views", "generation_cache"):
+        await server.db[name].delete_many({})
+    for name, documents in campus.items():
+        await server.db[name].insert_many([document.dict() for document in documents])
+    for cache in server.reference_caches.values():
+        cache.invalidate()
+    server.campus_occupancy.clear()
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies: list, elapsed: float, queries: int, failures: int) -> dict:
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "queries_per_request": round(queries / len(latencies), 2),
+    }
+
+
+async def run_requests(client, make_request, total: int, concurrency: int) -> dict:
+    """Issue ``total`` requests, ``concurrency`` at a time, and summarize them"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(index):
+        nonlocal failures
+        async with semaphore:
+            method, url, params = make_request(index)
+            started = time.perf_counter()
+            response = await client.request(method, url, params=params)
+            latencies.append(time.perf_counter() - started)
+            failures += response.status_code >= 400
+
+    server.db.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    return summarize(latencies, time.perf_counter() - started, server.db.reset(), failures)
+
+
+async def run_benchmarks(args) -> dict:
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo = AsyncIOMotorClient(args.mongo_url)
+        database_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        mongo = AsyncMongoMockClient()
+        database_name = "benchmark"
+    server.db = CountingDatabase(mongo[database_name])
+    await server.ensure_indexes()
+
+    transport = httpx.ASGITransport(app=server.app)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark/api", timeout=None) as client:
+            for batches, subjects, rooms in args.sizes:
+                await load_campus(build_campus(batches, subjects, rooms))
+                # Untimed warm-up: starts the solver pool and loads the campus occupancy index
+                await client.post(f"/timetables/generate/{DEPARTMENT}/{SEMESTER}",
+                                  params={"engine": args.engine, "seed": 0})
+                name = f"generate[{batches}x{subjects}x{rooms}]"
+                results[name] = await run_requests(
+                    client,
+                    lambda index: ("POST", f"/timetables/generate/{DEPARTMENT}/{SEMESTER}",
+                                   {"engine": args.engine, "seed": index + 1}),
+                    args.repeat, 1
+                )
+                print(f"  {name}: p50 {results[name]['p50_ms']} ms", file=sys.stderr)
+
+            # Reads run against the last campus with an active timetable (the warm-up result, now cached)
+            response = await client.post(f"/timetables/generate/{DEPARTMENT}/{SEMESTER}",
+                                         params={"engine": args.engine, "seed": 0})
+            timetable_id = response.json()["id"]
+            await client.patch(f"/timetables/{timetable_id}/activate")
+            batch_ids = [batch["id"] for batch in await server.db.batches.find({}, {"_id": 0, "id": 1}).to_list(None)]
+
+            def student(index):
+                return "GET", f"/student/timetable/{batch_ids[index % len(batch_ids)]}", None
+
+            def assignments(index):
+                return "GET", f"/assignments/batch/{batch_ids[index % len(batch_ids)]}", None
+
+            results["student_timetable"] = await run_requests(client, student, args.requests, args.concurrency)
+            results["assignments_batch"] = await run_requests(client, assignments, args.requests, args.concurrency)
+            results["timetables_list"] = await run_requests(
+                client, lambda index: ("GET", "/timetables", None), args.requests, args.concurrency
+            )
+            await server.db.batch_timetable_views.delete_many({})
+            results["student_timetable_live"] = await run_requests(client, student, args.requests, args.concurrency)
+    finally:
+        if args.mongo_url:
+            await mongo.drop_database(database_name)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each scenario against the baseline and return the regressed scenario names"""
+    regressions = []
+    print(f"\n{'scenario':<28} {'p95 (ms)':>10} {'baseline':>10} {'change':>8} {'queries':>8} {'baseline':>9}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<28} {result['p95_ms']:>10.2f} {'-':>10} {'new':>8} {result['queries_per_request']:>8}")
+            continue
+        change = result["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        regressed = change > tolerance or result["queries_per_request"] > previous["queries_per_request"]
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<28} {result['p95_ms']:>10.2f} {previous['p95_ms']:>10.2f} {change:>+7.0%} "
+              f"{result['queries_per_request']:>8} {previous['queries_per_request']:>9}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="4x6x6,8x8x12,16x8x24",
+                        type=lambda value: [parse_size(size) for size in value.split(",")],
+                        help="comma-separated campus sizes as BATCHESxSUBJECTSxROOMS")
+    parser.add_argument("--engine", default="greedy", choices=["greedy", "csp"])
+    parser.add_argument("--repeat", type=int, default=3, help="generation runs per campus size")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per read scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight per read scenario")
+    parser.add_argument("--mongo-url", help="benchmark a real mongod instead of mongomock-motor")
+    parser.add_argument("--save-baseline", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown before failing")
+    args = parser.parse_args()
+
+    # Keep request and index logs out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("server").setLevel(logging.ERROR)
+
+    print("Running scenarios...", file=sys.stderr)
+    results = asyncio.run(run_benchmarks(args))
+
+    print(f"\n{'scenario':<28} {'requests':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'req/s':>8} {'queries':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['requests']:>8} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['rps']:>8.1f} {result['queries_per_request']:>8} "
+              f"{result['failures']:>7}")
+
+    regressions = []
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline["scenarios"], args.tolerance)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "backend": "mongod" if args.mongo_url else "mongomock-motor",
+            "scenarios": results,
+        }, indent=2) + "\n")
+        print(f"\nBaseline written to {args.save_baseline}")
+    if regressions:
+        print(f"\nRegressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
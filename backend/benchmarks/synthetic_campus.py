@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Synthetic campus generator for the Smart Classroom & Timetable Scheduler.
+
+Builds a realistic multi-department campus far larger than init-sample-data:
+departments x semesters x batches, theory/practical/tutorial subjects,
+faculty teaching several subjects under varied hour caps and availability,
+and classrooms, equipment-specific laboratories and auditoriums sized to the
+timetable demand. --tightness (0-1) sets how little slack faculty hours and
+room-slots have over what the timetables need; at 1 supply matches demand
+and faculty carry more availability constraints.
+
+The campus is either inserted into Mongo in bulk (--to-db, using MONGO_URL
+and DB_NAME) or written to a directory as one JSON array per collection in
+MongoDB extended JSON, loadable with `mongoimport --jsonArray`.
+
+Usage: python backend/benchmarks/synthetic_campus.py --departments 10 --semesters 8
+           --batches-per-semester 4 --tightness 0.7 (--to-db [--replace] | --output campus/)
+"""
+
+import math
+import os
+import random
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# server.py reads these at import time; --to-db connects with its own client
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import typer  # noqa: E402
+from bson import json_util  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+
+from server import Assignment, Batch, DayOfWeek, Faculty, Room, Subject, SubjectType  # noqa: E402
+
+DEPARTMENT_NAMES = [
+    "Computer Science", "Electrical Engineering", "Mechanical Engineering", "Civil Engineering",
+    "Electronics", "Chemical Engineering", "Biotechnology", "Physics", "Chemistry", "Mathematics",
+]
+LAB_EQUIPMENT = ["Computers", "Electronics Kit", "Workshop Tools", "Chemistry Bench", "Physics Apparatus"]
+SLOTS_PER_WEEK = 42
+MAX_SUBJECTS_PER_FACULTY = 4
+# Assignment dates count from here rather than the clock, so a seed reproduces them too
+CAMPUS_EPOCH = datetime(2026, 1, 5, tzinfo=timezone.utc)
+# Collections written by the generator, plus the ones derived from them
+COLLECTIONS = ["rooms", "faculty", "subjects", "batches", "assignments"]
+DERIVED_COLLECTIONS = ["timetables", "timetable_entries", "active_timetables", "batch_timetable_views",
+                       "generation_cache"]
+
+app = typer.Typer(add_completion=False)
+
+
+def new_id(rng: random.Random) -> str:
+    """uuid4-shaped id drawn from ``rng`` so a seed reproduces ids as well as structure"""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def department_name(index: int) -> str:
+    if index < len(DEPARTMENT_NAMES):
+        return DEPARTMENT_NAMES[index]
+    return f"Department {index + 1}"
+
+
+def make_subjects(rng: random.Random, department: str, semester: int, count: int, equipment: str) -> List[Subject]:
+    """A semester's subjects: mostly theory, about one in five practical, some tutorials"""
+    subjects = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            subject_type, hours = SubjectType.PRACTICAL, rng.choice([2, 3])
+        elif roll < 0.3:
+            subject_type, hours = SubjectType.TUTORIAL, rng.choice([1, 2])
+        else:
+            subject_type, hours = SubjectType.THEORY, rng.choice([3, 3, 4, 4, 5])
+        practical = subject_type == SubjectType.PRACTICAL
+        subjects.append(Subject(
+            id=new_id(rng), name=f"{department} {semester}.{i + 1} {subject_type.value}",
+            code=f"{''.join(word[0] for word in department.split())}{semester}{i + 1:02d}",
+            department=department, semester=semester, subject_type=subject_type, hours_per_week=hours,
+            requires_lab=practical, required_equipment=[equipment] if practical else [],
+        ))
+    # Keep every batch's week solvable: trim the longest subjects until the load fits
+    while sum(subject.hours_per_week for subject in subjects) > SLOTS_PER_WEEK - 6:
+        max(subjects, key=lambda subject: subject.hours_per_week).hours_per_week -= 1
+    return subjects
+
+
+def make_constraints(rng: random.Random, tightness: float) -> dict:
+    """Availability for one faculty member; tighter campuses get more of it"""
+    unavailable, preferred = [], []
+    if rng.random() < 0.5 * tightness:
+        day = rng.choice(list(DayOfWeek)).value
+        unavailable.append(rng.choice([day, f"{day} 14:00-17:00", f"{day} 09:00-11:00"]))
+    if rng.random() < 0.5:
+        preferred.append(rng.choice(["09:00-13:15", "11:15-17:00", "14:00-17:00"]))
+    return {"unavailable_slots": unavailable, "preferred_time_slots": preferred,
+            "max_hours_per_day": rng.choice([4, 5, 6, 6]),
+            "max_hours_per_week": rng.choice([18, 20, 24, 24, 30])}
+
+
+def staff_department(rng: random.Random, department: str, subjects: List[Subject], batch_counts: Dict[int, int],
+                     slack: float, tightness: float) -> List[Faculty]:
+    """Faculty covering every subject's weekly hours times ``slack``, at most four subjects each"""
+    faculty: List[Faculty] = []
+    remaining: Dict[str, float] = {}
+    for subject in sorted(subjects, key=lambda subject: rng.random()):
+        needed = subject.hours_per_week * batch_counts[subject.semester] * slack
+        while needed > 0:
+            candidates = [member for member in faculty
+                          if remaining[member.id] >= subject.hours_per_week
+                          and len(member.subjects) < MAX_SUBJECTS_PER_FACULTY and subject.id not in member.subjects]
+            if candidates:
+                member = max(candidates, key=lambda member: remaining[member.id])
+            else:
+                member = Faculty(id=new_id(rng), name=f"Prof. {department[:3]} {len(faculty) + 1}",
+                                 department=department, **make_constraints(rng, tightness))
+                faculty.append(member)
+                remaining[member.id] = member.max_hours_per_week
+            member.subjects.append(subject.id)
+            subject.faculty_ids.append(member.id)
+            share = min(remaining[member.id], needed)
+            remaining[member.id] -= share
+            needed -= share
+    return faculty
+
+
+def make_rooms(rng: random.Random, demand: Counter, slack: float) -> List[Room]:
+    """Enough rooms of each kind for ``demand`` (weekly hours per room kind) times ``slack``"""
+    rooms = []
+    for kind, hours in sorted(demand.items()):
+        count = max(1, math.ceil(hours / SLOTS_PER_WEEK * slack))
+        for i in range(count):
+            if kind == "Classroom":
+                rooms.append(Room(id=new_id(rng), name=f"Room {len(rooms) + 101}",
+                                  capacity=rng.choice([40, 60, 60, 80, 100]), room_type="Classroom",
+                                  equipment=["Projector"] if rng.random() < 0.7 else []))
+            elif kind == "Auditorium":
+                rooms.append(Room(id=new_id(rng), name=f"Auditorium {i + 1}",
+                                  capacity=rng.choice([150, 200, 300]), room_type="Auditorium",
+                                  equipment=["Projector", "Sound System"]))
+            else:
+                rooms.append(Room(id=new_id(rng), name=f"{kind} Lab {i + 1}",
+                                  capacity=rng.choice([30, 40, 60, 80]), room_type="Laboratory",
+                                  equipment=[kind, "Projector"]))
+    return rooms
+
+
+def build_campus(departments: int, semesters: int, batches_per_semester: int, subjects_per_semester: int,
+                 tightness: float, assignments_per_batch: int, seed: int) -> Dict[str, list]:
+    """Models for a whole campus keyed by collection name"""
+    rng = random.Random(seed)
+    faculty_slack = 1 + 1.5 * (1 - tightness)
+    # Batches of different sizes and subject mixes never pack rooms perfectly, so rooms keep a margin
+    room_slack = 1.15 + (1 - tightness)
+    campus: Dict[str, list] = {name: [] for name in COLLECTIONS}
+    room_demand: Counter = Counter()
+
+    for d in range(departments):
+        department = department_name(d)
+        equipment = LAB_EQUIPMENT[d % len(LAB_EQUIPMENT)]
+        subjects, batch_counts = [], {}
+        for semester in range(1, semesters + 1):
+            semester_subjects = make_subjects(rng, department, semester, subjects_per_semester, equipment)
+            # Some semesters run an extra batch so departments are not uniform
+            batch_counts[semester] = batches_per_semester + (1 if rng.random() < 0.25 else 0)
+            batches = []
+            for b in range(batch_counts[semester]):
+                student_count = rng.randint(100, 160) if rng.random() < 0.1 else rng.randint(30, 75)
+                section = f"{chr(ord('A') + b % 26)}{b // 26 or ''}"
+                batches.append(Batch(id=new_id(rng), name=f"{department} S{semester} {section}",
+                                     department=department, semester=semester, student_count=student_count,
+                                     subjects=[subject.id for subject in semester_subjects]))
+                for subject in semester_subjects:
+                    if subject.requires_lab:
+                        room_demand[equipment] += subject.hours_per_week
+                    elif student_count > 100:
+                        room_demand["Auditorium"] += subject.hours_per_week
+                    else:
+                        room_demand["Classroom"] += subject.hours_per_week
+            subjects.extend(semester_subjects)
+            campus["batches"].extend(batches)
+        faculty = staff_department(rng, department, subjects, batch_counts, faculty_slack, tightness)
+        campus["subjects"].extend(subjects)
+        campus["faculty"].extend(faculty)
+
+    subjects_by_id = {subject.id: subject for subject in campus["subjects"]}
+    for batch in campus["batches"]:
+        for i in range(assignments_per_batch):
+            subject = subjects_by_id[rng.choice(batch.subjects)]
+            campus["assignments"].append(Assignment(
+                id=new_id(rng), title=f"{subject.code} Assignment {i + 1}",
+                description=f"Coursework for {subject.name}",
+                subject_id=subject.id, faculty_id=rng.choice(subject.faculty_ids), batch_id=batch.id,
+                due_date=CAMPUS_EPOCH + timedelta(days=rng.randint(7, 120)), created_at=CAMPUS_EPOCH,
+            ))
+    campus["rooms"] = make_rooms(rng, room_demand, room_slack)
+    return campus
+
+
+def describe(campus: Dict[str, list]) -> str:
+    subjects_by_id = {subject.id: subject for subject in campus["subjects"]}
+    demand = sum(subjects_by_id[subject_id].hours_per_week
+                 for batch in campus["batches"] for subject_id in batch.subjects)
+    faculty_hours = sum(member.max_hours_per_week for member in campus["faculty"])
+    room_types = Counter(room.room_type for room in campus["rooms"])
+    lines = [f"{name:<12} {len(documents):>7}" for name, documents in campus.items()]
+    lines.append(f"room types   {', '.join(f'{kind} {count}' for kind, count in sorted(room_types.items()))}")
+    lines.append(f"teaching     {demand} h/week against {faculty_hours} faculty h/week "
+                 f"({demand / faculty_hours:.0%} of capacity)")
+    lines.append(f"room-slots   {demand / (len(campus['rooms']) * SLOTS_PER_WEEK):.0%} of "
+                 f"{len(campus['rooms']) * SLOTS_PER_WEEK} in use")
+    return "\n".join(lines)
+
+
+@app.command()
+def generate(
+    departments: int = typer.Option(10, min=1, help="Number of departments"),
+    semesters: int = typer.Option(8, min=1, help="Semesters per department"),
+    batches_per_semester: int = typer.Option(3, min=1, help="Batches in each department semester"),
+    subjects_per_semester: int = typer.Option(8, min=1, max=14, help="Subjects in each department semester"),
+    tightness: float = typer.Option(0.5, min=0.0, max=1.0, help="0 = generous faculty and rooms, 1 = just enough"),
+    assignments_per_batch: int = typer.Option(5, min=0, help="Assignments created for every batch"),
+    seed: int = typer.Option(0, help="Random seed; the same options and seed give the same campus"),
+    output: Optional[Path] = typer.Option(None, help="Write <collection>.json files to this directory"),
+    to_db: bool = typer.Option(False, "--to-db", help="Insert into the database at MONGO_URL/DB_NAME"),
+    replace: bool = typer.Option(False, help="With --to-db, delete existing campus data and timetables first"),
+    mongo_url: str = typer.Option("mongodb://localhost:27017", envvar="MONGO_URL"),
+    db_name: str = typer.Option("test_database", envvar="DB_NAME"),
+    chunk_size: int = typer.Option(5000, min=1, help="Documents per insert_many call"),
+):
+    """Generate a synthetic campus and load it into Mongo or write it to files."""
+    if output is None and not to_db:
+        raise typer.BadParameter("pass --output DIR and/or --to-db")
+
+    campus = build_campus(departments, semesters, batches_per_semester, subjects_per_semester,
+                          tightness, assignments_per_batch, seed)
+    typer.echo(describe(campus))
+
+    if output is not None:
+        output.mkdir(parents=True, exist_ok=True)
+        for name, documents in campus.items():
+            (output / f"{name}.json").write_text(
+                json_util.dumps([document.dict() for document in documents],
+                                json_options=json_util.RELAXED_JSON_OPTIONS)
+            )
+        typer.echo(f"Wrote {len(campus)} collections to {output}")
+
+    if to_db:
+        database = MongoClient(mongo_url)[db_name]
+        if replace:
+            for name in COLLECTIONS + DERIVED_COLLECTIONS:
+                database[name].delete_many({})
+        for name, documents in campus.items():
+            for start in range(0, len(documents), chunk_size):
+                database[name].insert_many([document.dict() for document in documents[start:start + chunk_size]],
+                                           ordered=False)
+        typer.echo(f"Inserted campus into {db_name}; restart API workers or wait for the reference cache TTL "
+                   "before generating timetables")
+
+
+if __name__ == "__main__":
+    app()
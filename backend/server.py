@@ -1,23 +1,79 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DeleteMany, IndexModel, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, PyMongoError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, get_origin
 import uuid
-from datetime import datetime, time, timezone
+import hashlib
+import json
+import orjson
+import csv
+import io
+from datetime import datetime, time, timedelta, timezone
 from enum import Enum
 import random
+import math
+import bisect
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from time import perf_counter
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Mongo command accounting
+class RequestMetrics:
+    """Mongo commands issued on behalf of one request and the time they took"""
+    __slots__ = ("queries", "db_seconds", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, duration_micros: int):
+        # Called from Motor's executor threads, possibly several at once
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += duration_micros / 1_000_000
+
+# Motor runs each operation on an executor thread inside a copy of the calling
+# context, so command events see the RequestMetrics of the request that issued them
+request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Charge every Mongo command (getMore included) to the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    @staticmethod
+    def _record(event):
+        metrics = request_metrics.get()
+        if metrics is not None:
+            metrics.record(event.duration_micros)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandListener()])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -40,6 +96,10 @@ class SubjectType(str, Enum):
     PRACTICAL = "Practical"
     TUTORIAL = "Tutorial"
 
+class SolverEngine(str, Enum):
+    GREEDY = "greedy"
+    CSP = "csp"
+
 # Data Models
 class Room(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -68,6 +128,7 @@ class Subject(BaseModel):
     subject_type: SubjectType
     hours_per_week: int
     requires_lab: bool = False
+    required_equipment: List[str] = []
     faculty_ids: List[str] = []
 
 class Batch(BaseModel):
@@ -104,6 +165,18 @@ class Timetable(BaseModel):
     entries: List[TimetableEntry] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     is_active: bool = False
+    solver_stats: Optional[Dict[str, Any]] = None
+
+class TimetableSummary(BaseModel):
+    id: str
+    name: str
+    department: str
+    semester: int
+    is_active: bool = False
+    entry_count: int = 0
+    created_at: datetime
+    entries: Optional[List[TimetableEntry]] = None  # only with include_entries
+    solver_stats: Optional[Dict[str, Any]] = None  # only with include_entries
 
 class Assignment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -136,6 +209,8 @@ class FacultyCreate(BaseModel):
     subjects: List[str] = []
     max_hours_per_day: int = 6
     max_hours_per_week: int = 30
+    preferred_time_slots: List[str] = []
+    unavailable_slots: List[str] = []
 
 class SubjectCreate(BaseModel):
     name: str
@@ -145,6 +220,7 @@ class SubjectCreate(BaseModel):
     subject_type: SubjectType
     hours_per_week: int
     requires_lab: bool = False
+    required_equipment: List[str] = []
 
 class BatchCreate(BaseModel):
     name: str
@@ -161,10 +237,650 @@ class AssignmentCreate(BaseModel):
     batch_id: str
     due_date: datetime
 
+class GenerationTarget(BaseModel):
+    department: str
+    semester: int
+
+class BulkGenerateRequest(BaseModel):
+    targets: List[GenerationTarget]
+    engine: SolverEngine = SolverEngine.GREEDY
+    optimize_ms: int = Field(default=0, ge=0)
+    seed: Optional[int] = None
+
+class TimetableDelta(BaseModel):
+    unavailable_faculty_ids: List[str] = []
+    unavailable_room_ids: List[str] = []
+    changed_subject_ids: List[str] = []
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class GenerationJobCreate(BaseModel):
+    department: str
+    semester: int
+    engine: SolverEngine = SolverEngine.GREEDY
+    optimize_ms: int = Field(default=0, ge=0)
+    seed: Optional[int] = None
+
+class GenerationJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    department: str
+    semester: int
+    engine: SolverEngine = SolverEngine.GREEDY
+    optimize_ms: int = 0
+    seed: Optional[int] = None
+    status: JobStatus = JobStatus.QUEUED
+    entries_placed: int = 0
+    hours_unscheduled: Optional[int] = None
+    elapsed_ms: float = 0
+    cancel_requested: bool = False
+    timetable_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
 # Timetable Generation Algorithm
+class SlotOccupancy:
+    """Per-batch, per-faculty and per-room bitmasks of busy slots over the weekly grid"""
+
+    def __init__(self):
+        # Bit i is set when the resource is busy in slot index i (slot_number - 1)
+        self.batches: Dict[str, int] = {}
+        self.faculty: Dict[str, int] = {}
+        self.rooms: Dict[str, int] = {}
+        self.faculty_limits: Dict[str, tuple] = {}
+        self.faculty_load: Dict[str, List[int]] = {}
+        # Slots of days (or the whole week) a capped faculty member has filled, so they drop out of every domain
+        self.faculty_capped: Dict[str, int] = {}
+
+    def is_free(self, batch_id: str, faculty_id: str, room_id: str, slot_index: int) -> bool:
+        busy = (self.batches.get(batch_id, 0) |
+                self.faculty_busy(faculty_id) |
+                self.rooms.get(room_id, 0))
+        return not (busy >> slot_index) & 1
+
+    def faculty_busy(self, faculty_id: str) -> int:
+        """Slots a faculty member cannot take: booked, unavailable or over their hour caps"""
+        return self.faculty.get(faculty_id, 0) | self.faculty_capped.get(faculty_id, 0)
+
+    def limit_faculty(self, faculty_id: str, max_per_day: int, max_per_week: int,
+                      slots_per_day: int, num_days: int, unavailable: int = 0):
+        """Cap a faculty member's daily and weekly hours; slots booked so far count towards the caps"""
+        busy = self.faculty.get(faculty_id, 0)
+        day_mask = (1 << slots_per_day) - 1
+        self.faculty_limits[faculty_id] = (max_per_day, max_per_week, slots_per_day, num_days)
+        self.faculty_load[faculty_id] = [((busy >> (day * slots_per_day)) & day_mask).bit_count()
+                                         for day in range(num_days)]
+        self.faculty[faculty_id] = busy | unavailable
+        self._refresh_cap(faculty_id)
+
+    def _refresh_cap(self, faculty_id: str):
+        max_per_day, max_per_week, slots_per_day, num_days = self.faculty_limits[faculty_id]
+        load = self.faculty_load[faculty_id]
+        day_mask = (1 << slots_per_day) - 1
+        if sum(load) >= max_per_week:
+            capped = (1 << (slots_per_day * num_days)) - 1
+        else:
+            capped = 0
+            for day, hours in enumerate(load):
+                if hours >= max_per_day:
+                    capped |= day_mask << (day * slots_per_day)
+        self.faculty_capped[faculty_id] = capped
+
+    def _count_faculty_hour(self, faculty_id: str, slot_index: int, delta: int):
+        if faculty_id in self.faculty_limits:
+            slots_per_day = self.faculty_limits[faculty_id][2]
+            self.faculty_load[faculty_id][slot_index // slots_per_day] += delta
+            self._refresh_cap(faculty_id)
+
+    def is_room_free(self, room_id: str, slot_index: int) -> bool:
+        return not (self.rooms.get(room_id, 0) >> slot_index) & 1
+
+    def occupy(self, batch_id: str, faculty_id: str, room_id: str, slot_index: int):
+        bit = 1 << slot_index
+        self.batches[batch_id] = self.batches.get(batch_id, 0) | bit
+        self.faculty[faculty_id] = self.faculty.get(faculty_id, 0) | bit
+        self.rooms[room_id] = self.rooms.get(room_id, 0) | bit
+        self._count_faculty_hour(faculty_id, slot_index, 1)
+
+    def reserve(self, faculty: Dict[str, int], rooms: Dict[str, int]):
+        """Mark faculty and room slots that are held elsewhere as busy"""
+        for faculty_id, mask in faculty.items():
+            self.faculty[faculty_id] = self.faculty.get(faculty_id, 0) | mask
+        for room_id, mask in rooms.items():
+            self.rooms[room_id] = self.rooms.get(room_id, 0) | mask
+
+    def copy(self) -> "SlotOccupancy":
+        clone = SlotOccupancy()
+        clone.batches = dict(self.batches)
+        clone.faculty = dict(self.faculty)
+        clone.rooms = dict(self.rooms)
+        clone.faculty_limits = dict(self.faculty_limits)
+        clone.faculty_load = {faculty_id: list(load) for faculty_id, load in self.faculty_load.items()}
+        clone.faculty_capped = dict(self.faculty_capped)
+        return clone
+
+    def release(self, batch_id: str, faculty_id: str, room_id: str, slot_index: int):
+        bit = ~(1 << slot_index)
+        self.batches[batch_id] &= bit
+        self.faculty[faculty_id] &= bit
+        self.rooms[room_id] &= bit
+        self._count_faculty_hour(faculty_id, slot_index, -1)
+
+class RoomIndex:
+    """Rooms grouped by lab/non-lab and sorted by capacity for best-fit lookups"""
+
+    def __init__(self, rooms):
+        self.capacity = {room["id"]: room.get("capacity", 0) for room in rooms}
+        self.equipment = {room["id"]: set(room.get("equipment", [])) for room in rooms}
+        self.by_type: Dict[bool, List[tuple]] = {True: [], False: []}
+        for room in rooms:
+            self.by_type[room["room_type"] == "Laboratory"].append((room.get("capacity", 0), room["id"]))
+        for rooms_of_type in self.by_type.values():
+            rooms_of_type.sort()
+        self._cache: Dict[tuple, List[str]] = {}
+
+    def candidates(self, requires_lab: bool, student_count: int = 0, equipment=()) -> List[str]:
+        """Room ids in preference order, cached per requirement"""
+        key = (requires_lab, student_count, tuple(sorted(equipment)))
+        if key not in self._cache:
+            fitting = []
+            undersized = []
+            # Rooms that seat the batch smallest first, else undersized ones largest first; labs come last for theory
+            for is_lab in ((True,) if requires_lab else (False, True)):
+                rooms_of_type = [(capacity, room_id) for capacity, room_id in self.by_type[is_lab]
+                                 if self.equipment[room_id].issuperset(equipment)]
+                split = bisect.bisect_left(rooms_of_type, (student_count, ""))
+                fitting.extend(room_id for _, room_id in rooms_of_type[split:])
+                undersized.extend(room_id for _, room_id in reversed(rooms_of_type[:split]))
+            self._cache[key] = fitting or undersized
+        return self._cache[key]
+
+    def best_fit(self, candidates: List[str], occupancy: "SlotOccupancy", slot_index: int) -> Optional[str]:
+        """First candidate room that is free in ``slot_index``"""
+        for room_id in candidates:
+            if occupancy.is_room_free(room_id, slot_index):
+                return room_id
+        return None
+
+class SolverDiagnostics:
+    """Counters and phase timings collected during one solve"""
+
+    def __init__(self):
+        self.phases_ms: Dict[str, float] = {}
+        self.placement_attempts = 0
+        self.conflict_checks = 0
+        # Greedy charges each slot it tries; CSP charges every slot dropped when domains are recomputed
+        self.rejections = {"batch": 0, "faculty": 0, "room": 0}
+        self.batches: List[Dict[str, Any]] = []
+        self.unscheduled: List[Dict[str, Any]] = []
+
+    def reject(self, batch_busy: int, faculty_busy: int, room_busy: int):
+        """Charge every busy slot to the batch, else to all eligible faculty, else to all suitable rooms"""
+        self.rejections["batch"] += batch_busy.bit_count()
+        self.rejections["faculty"] += (faculty_busy & ~batch_busy).bit_count()
+        self.rejections["room"] += (room_busy & ~batch_busy & ~faculty_busy).bit_count()
+
+    @staticmethod
+    def blocked_slots(occupancy: "SlotOccupancy", batch_id: str, faculty_ids, room_ids,
+                      full_mask: int) -> Dict[str, int]:
+        """Slots a (batch, subject) pair cannot use right now, by first blocking resource"""
+        batch_busy = occupancy.batches.get(batch_id, 0) & full_mask
+        faculty_busy = full_mask
+        for faculty_id in faculty_ids:
+            faculty_busy &= occupancy.faculty_busy(faculty_id)
+        room_busy = full_mask
+        for room_id in room_ids:
+            room_busy &= occupancy.rooms.get(room_id, 0)
+        return {
+            "batch": batch_busy.bit_count(),
+            "faculty": (faculty_busy & ~batch_busy).bit_count(),
+            "room": (room_busy & ~batch_busy & ~faculty_busy).bit_count(),
+        }
+
+    def shortfall(self, batch_data, subject_data, assigned_hours: int, hours_needed: int,
+                  blocked: Optional[Dict[str, int]] = None):
+        self.unscheduled.append({
+            "batch_id": batch_data["id"],
+            "batch": batch_data.get("name"),
+            "subject_id": subject_data["id"],
+            "subject": subject_data.get("name"),
+            "hours_missing": hours_needed - assigned_hours,
+            "blocked_slots": blocked,
+        })
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {phase: round(ms, 3) for phase, ms in self.phases_ms.items()},
+            "placement_attempts": self.placement_attempts,
+            "conflict_checks": self.conflict_checks,
+            "rejections": dict(self.rejections),
+            "bottleneck": max(self.rejections, key=self.rejections.get) if any(self.rejections.values()) else None,
+            "unscheduled": self.unscheduled,
+            "batches": self.batches,
+        }
+
+class CSPSolver:
+    """Backtracking search over (batch, subject) sessions with forward checking and MRV ordering"""
+
+    def __init__(self, occupancy: SlotOccupancy, num_slots: int, slots_per_day: int,
+                 node_limit: int = 20000, report=None, diagnostics: Optional[SolverDiagnostics] = None):
+        self.occupancy = occupancy
+        self.report = report
+        self.diagnostics = diagnostics
+        self.full_mask = (1 << num_slots) - 1
+        self.day_masks = [((1 << slots_per_day) - 1) << start
+                          for start in range(0, num_slots, slots_per_day)]
+        self.slots_per_day = slots_per_day
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.filled = 0
+
+    def solve(self, groups: List[Dict[str, Any]]) -> List[tuple]:
+        """Place each group's ``hours`` sessions; returns (group_index, slot, faculty_id, room_id) tuples"""
+        # A group with no eligible faculty member or no suitable room cannot be placed at all
+        self.groups = [dict(group, remaining=group["hours"], slots=[], days=[0] * len(self.day_masks))
+                       for group in groups if group["faculty_ids"] and group["room_ids"]]
+        placements = []
+        best = []
+        stack = []  # frames of [group_index, candidate_slots, next_position]
+
+        while self.nodes < self.node_limit:
+            choice = self._select()
+            if choice is None:
+                break
+            group_index, domain, deficit = choice
+            if deficit and not stack:
+                # Over-constrained before any choice was made: no search can
+                # place these sessions, so aim for what fits and keep going
+                group = self.groups[group_index]
+                group["remaining"] -= min(deficit, group["remaining"])
+                continue
+            # A dead end (positive deficit) pushes no frame, so the loop below backtracks
+            if not deficit:
+                stack.append([group_index, self._order_values(self.groups[group_index], domain), 0])
+
+            # Advance the deepest frame that still has untried values
+            while stack:
+                frame = stack[-1]
+                if len(placements) == len(stack):
+                    self._undo(placements.pop())
+                if frame[2] < len(frame[1]):
+                    slot_index = frame[1][frame[2]]
+                    frame[2] += 1
+                    placements.append(self._place(frame[0], slot_index))
+                    self.nodes += 1
+                    if len(placements) > len(best):
+                        best = list(placements)
+                    if self.report:
+                        self.report(len(placements))
+                    break
+                stack.pop()
+            if not stack:
+                break
+
+        if len(best) > len(placements):
+            # Resume from the deepest partial assignment the search reached
+            for placement in reversed(placements):
+                self._undo(placement)
+            placements = [self._place(*placement) for placement in best]
+
+        # Budget exhausted or search space exhausted: keep what fits without search
+        for group_index, group in enumerate(self.groups):
+            group["remaining"] = group["hours"] - len(group["slots"])
+            while group["remaining"]:
+                domain = self._domain(group, {}, {})
+                if not domain:
+                    break
+                placements.append(self._place(group_index, (domain & -domain).bit_length() - 1))
+                self.filled += 1
+
+        return [(self.groups[gi]["index"], slot, faculty_id, room_id)
+                for gi, slot, faculty_id, room_id in placements]
+
+    def _select(self):
+        """Return (group_index, domain, deficit) for the open group with the least slack"""
+        best = None
+        best_key = None
+        faculty_cache: Dict[str, int] = {}
+        room_cache: Dict[tuple, int] = {}
+        batch_demand: Dict[str, list] = {}
+        for group_index, group in enumerate(self.groups):
+            if not group["remaining"]:
+                continue
+            free = self._domain(group, faculty_cache, room_cache)
+            domain = free
+            if group["slots"]:
+                # Sessions of one group are interchangeable; only try increasing slots
+                domain &= ~((1 << (max(group["slots"]) + 1)) - 1)
+            slack = domain.bit_count() - group["remaining"]
+            # Fewer free slots than sessions left: a dead end, returned with a positive deficit
+            if slack < 0:
+                return group_index, domain, -slack
+            key = (slack, -group["remaining"])
+            if best_key is None or key < best_key:
+                best, best_key = (group_index, domain, 0), key
+            demand = batch_demand.setdefault(group["batch_id"], [0, 0, group_index])
+            demand[0] += group["remaining"]
+            demand[1] |= free
+        
+        # A batch's sessions all need distinct slots, so together they cannot
+        # exceed the slots any of them could still use
+        for remaining, union, group_index in batch_demand.values():
+            if union.bit_count() < remaining:
+                return group_index, 0, remaining - union.bit_count()
+        return best
+
+    def _domain(self, group, faculty_cache, room_cache) -> int:
+        """Slots where the batch, some eligible faculty member and some suitable room are free"""
+        faculty_key = group["faculty_key"]
+        if faculty_key not in faculty_cache:
+            busy = self.full_mask
+            for faculty_id in group["faculty_ids"]:
+                busy &= self.occupancy.faculty_busy(faculty_id)
+            faculty_cache[faculty_key] = busy
+        room_key = group["room_key"]
+        if room_key not in room_cache:
+            busy = self.full_mask
+            for room_id in group["room_ids"]:
+                busy &= self.occupancy.rooms.get(room_id, 0)
+            room_cache[room_key] = busy
+        batch_busy = self.occupancy.batches.get(group["batch_id"], 0)
+        if self.diagnostics:
+            self.diagnostics.conflict_checks += 1
+            self.diagnostics.reject(batch_busy, faculty_cache[faculty_key], room_cache[room_key])
+        return self.full_mask & ~(batch_busy | faculty_cache[faculty_key] | room_cache[room_key])
+
+    def _order_values(self, group, domain) -> List[int]:
+        """Slots on days without this subject first, faculty-preferred slots first within each, earliest first"""
+        used_days = 0
+        for day, count in enumerate(group["days"]):
+            if count:
+                used_days |= self.day_masks[day]
+        preferred = group.get("preferred_mask", 0)
+        ordered = []
+        for mask in (domain & ~used_days & preferred, domain & ~used_days & ~preferred,
+                     domain & used_days & preferred, domain & used_days & ~preferred):
+            while mask:
+                low = mask & -mask
+                ordered.append(low.bit_length() - 1)
+                mask ^= low
+        return ordered
+
+    def _place(self, group_index: int, slot_index: int,
+               faculty_id: Optional[str] = None, room_id: Optional[str] = None) -> tuple:
+        group = self.groups[group_index]
+        occupancy = self.occupancy
+        if faculty_id is None:
+            free = [f for f in group["faculty_ids"] if not (occupancy.faculty_busy(f) >> slot_index) & 1]
+            preferences = group.get("preferred", {})
+            faculty_id = next((f for f in free if (preferences.get(f, 0) >> slot_index) & 1), free[0])
+        if room_id is None:
+            room_id = next(r for r in group["room_ids"]
+                           if not (occupancy.rooms.get(r, 0) >> slot_index) & 1)
+        occupancy.occupy(group["batch_id"], faculty_id, room_id, slot_index)
+        group["remaining"] -= 1
+        group["slots"].append(slot_index)
+        group["days"][slot_index // self.slots_per_day] += 1
+        return group_index, slot_index, faculty_id, room_id
+
+    def _undo(self, placement: tuple):
+        group_index, slot_index, faculty_id, room_id = placement
+        group = self.groups[group_index]
+        self.occupancy.release(group["batch_id"], faculty_id, room_id, slot_index)
+        group["remaining"] += 1
+        group["slots"].remove(slot_index)
+        group["days"][slot_index // self.slots_per_day] -= 1
+
+# Annealing moves per millisecond of optimize_ms for seeded solves, roughly
+# what the optimizer sustains on a single core
+OPTIMIZER_MOVES_PER_MS = 100
+
+class TimetableOptimizer:
+    """Simulated annealing over the sessions of a feasible timetable"""
+
+    WEIGHTS = {
+        "batch_gaps": 1.0,
+        "subject_clustering": 2.0,
+        "preferred_slot_violations": 1.0,
+        "room_type_mismatches": 3.0,
+    }
+
+    def __init__(self, occupancy: SlotOccupancy, sessions: List[tuple], num_slots: int,
+                 slots_per_day: int, preferred: Dict[str, int], room_is_lab: Dict[str, bool],
+                 room_index: RoomIndex, rng: Optional[random.Random] = None, report=None):
+        """``sessions``: already placed (batch, subject, faculty, room, slot, requires_lab, room candidates)"""
+        self.occupancy = occupancy
+        self.num_slots = num_slots
+        self.slots_per_day = slots_per_day
+        self.day_mask = (1 << slots_per_day) - 1
+        self.room_is_lab = room_is_lab
+        self.room_index = room_index
+        self.rng = rng or random.Random()
+        self.report = report
+        self.batch, self.subject, self.faculty, self.room, self.slot, self.requires_lab, self.candidates = (
+            [list(column) for column in zip(*sessions)] if sessions else [[] for _ in range(7)]
+        )
+        self.preferred = [preferred.get(faculty_id, 0) for faculty_id in self.faculty]
+        self.by_batch: Dict[str, List[int]] = {}
+        for session, batch_id in enumerate(self.batch):
+            self.by_batch.setdefault(batch_id, []).append(session)
+        self.subject_days: Dict[tuple, int] = {}
+        for session in range(len(self.slot)):
+            key = (self.batch[session], self.subject[session], self.slot[session] // slots_per_day)
+            self.subject_days[key] = self.subject_days.get(key, 0) + 1
+        self.moves_tried = 0
+        self.moves_accepted = 0
+
+    def score(self) -> Dict[str, float]:
+        """Full objective breakdown, recomputed from scratch"""
+        terms = {
+            "batch_gaps": sum(self._gaps(self.occupancy.batches.get(batch_id, 0), day)
+                              for batch_id in self.by_batch for day in range(self.num_slots // self.slots_per_day)),
+            "subject_clustering": sum(count - 1 for count in self.subject_days.values() if count > 1),
+            "preferred_slot_violations": sum(self._misses_preference(session, self.slot[session])
+                                             for session in range(len(self.slot))),
+            "room_type_mismatches": sum(self._room_mismatch(session, self.room[session])
+                                        for session in range(len(self.slot))),
+        }
+        terms["total"] = sum(self.WEIGHTS[name] * value for name, value in terms.items())
+        return terms
+
+    def run(self, time_budget_ms: float, move_budget: Optional[int] = None,
+            start_temperature: float = 2.0, end_temperature: float = 0.05):
+        """Anneal for ``time_budget_ms`` (or ``move_budget`` moves) and leave the best timetable found applied"""
+        cost = self.score()["total"]
+        best_cost, best = cost, (list(self.slot), list(self.room))
+        if len(self.slot) < 2:
+            return
+        started = perf_counter()
+        budget = time_budget_ms / 1000
+        ratio = end_temperature / start_temperature
+        temperature = start_temperature
+        sessions = len(self.slot)
+        rng = self.rng
+        while True:
+            if not self.moves_tried & 255:
+                # Following the move count keeps a seeded run independent of machine speed and load
+                if move_budget is not None:
+                    progress = self.moves_tried / move_budget
+                else:
+                    progress = (perf_counter() - started) / budget
+                if progress >= 1:
+                    break
+                temperature = start_temperature * ratio ** progress
+                if self.report:
+                    self.report()
+            self.moves_tried += 1
+            # Moves go through occupancy, so hard constraints (faculty caps included) always hold
+            session = rng.randrange(sessions)
+            if rng.random() < 0.7:
+                delta = self._relocate(session, rng.randrange(self.num_slots), temperature)
+            else:
+                delta = self._swap(session, rng.choice(self.by_batch[self.batch[session]]), temperature)
+            if delta is None:
+                continue
+            self.moves_accepted += 1
+            cost += delta
+            if cost < best_cost - 1e-9:
+                best_cost, best = cost, (list(self.slot), list(self.room))
+        if cost > best_cost + 1e-9:
+            self._restore(*best)
+
+    def _accept(self, delta: float, temperature: float) -> bool:
+        return delta <= 0 or self.rng.random() < math.exp(-delta / temperature)
+
+    def _gaps(self, mask: int, day: int) -> int:
+        """Free slots between a batch's first and last session of the day"""
+        hours = (mask >> (day * self.slots_per_day)) & self.day_mask
+        if not hours:
+            return 0
+        return hours.bit_length() - (hours & -hours).bit_length() + 1 - hours.bit_count()
+
+    def _misses_preference(self, session: int, slot_index: int) -> int:
+        preferred = self.preferred[session]
+        return 1 if preferred and not (preferred >> slot_index) & 1 else 0
+
+    def _room_mismatch(self, session: int, room_id: str) -> int:
+        return 1 if self.requires_lab[session] != self.room_is_lab.get(room_id, False) else 0
+
+    def _shift_subject_day(self, session: int, from_day: int, to_day: int) -> int:
+        """Move one session between subject-day counters; returns the clustering change"""
+        if from_day == to_day:
+            return 0
+        batch_id, subject_id = self.batch[session], self.subject[session]
+        counts = self.subject_days
+        before = counts[(batch_id, subject_id, from_day)]
+        after = counts.get((batch_id, subject_id, to_day), 0)
+        counts[(batch_id, subject_id, from_day)] = before - 1
+        counts[(batch_id, subject_id, to_day)] = after + 1
+        return (1 if after >= 1 else 0) - (1 if before >= 2 else 0)
+
+    def _free_room(self, session: int, slot_index: int) -> Optional[str]:
+        """The session's own room if it is free in ``slot_index``, else the best-fitting free one"""
+        room_id = self.room[session]
+        if self.occupancy.is_room_free(room_id, slot_index):
+            return room_id
+        return self.room_index.best_fit(self.candidates[session], self.occupancy, slot_index)
+
+    def _relocate(self, session: int, slot_index: int, temperature: float) -> Optional[float]:
+        """Move ``session`` to ``slot_index``; returns the cost change, or None if rejected"""
+        occupancy = self.occupancy
+        batch_id, faculty_id, room_id, current = (self.batch[session], self.faculty[session],
+                                                  self.room[session], self.slot[session])
+        if slot_index == current or (occupancy.batches[batch_id] >> slot_index) & 1:
+            return None
+        occupancy.release(batch_id, faculty_id, room_id, current)
+        new_room = None
+        if not (occupancy.faculty_busy(faculty_id) >> slot_index) & 1:
+            new_room = self._free_room(session, slot_index)
+        if new_room is None:
+            occupancy.occupy(batch_id, faculty_id, room_id, current)
+            return None
+
+        # Only the batch-days, subject-day counters and session this move touches change cost
+        weights = self.WEIGHTS
+        others = occupancy.batches[batch_id]
+        before, after = others | (1 << current), others | (1 << slot_index)
+        from_day, to_day = current // self.slots_per_day, slot_index // self.slots_per_day
+        gaps = self._gaps(after, from_day) - self._gaps(before, from_day)
+        if to_day != from_day:
+            gaps += self._gaps(after, to_day) - self._gaps(before, to_day)
+        clustering = self._shift_subject_day(session, from_day, to_day)
+        delta = (weights["batch_gaps"] * gaps +
+                 weights["subject_clustering"] * clustering +
+                 weights["preferred_slot_violations"] * (self._misses_preference(session, slot_index) -
+                                                         self._misses_preference(session, current)) +
+                 weights["room_type_mismatches"] * (self._room_mismatch(session, new_room) -
+                                                    self._room_mismatch(session, room_id)))
+        if not self._accept(delta, temperature):
+            self._shift_subject_day(session, to_day, from_day)
+            occupancy.occupy(batch_id, faculty_id, room_id, current)
+            return None
+        occupancy.occupy(batch_id, faculty_id, new_room, slot_index)
+        self.slot[session], self.room[session] = slot_index, new_room
+        return delta
+
+    def _swap(self, first: int, second: int, temperature: float) -> Optional[float]:
+        """Exchange the slots of two sessions of one batch; returns the cost change, or None if rejected"""
+        if (self.subject[first] == self.subject[second] and self.faculty[first] == self.faculty[second]
+                and self.room[first] == self.room[second]):
+            return None  # interchangeable sessions, including first == second
+        occupancy = self.occupancy
+        batch_id = self.batch[first]
+        first_slot, second_slot = self.slot[first], self.slot[second]
+        first_room, second_room = self.room[first], self.room[second]
+        occupancy.release(batch_id, self.faculty[first], first_room, first_slot)
+        occupancy.release(batch_id, self.faculty[second], second_room, second_slot)
+
+        new_first_room = new_second_room = None
+        if not (occupancy.faculty_busy(self.faculty[first]) >> second_slot) & 1:
+            new_first_room = self._free_room(first, second_slot)
+        if new_first_room is not None:
+            occupancy.occupy(batch_id, self.faculty[first], new_first_room, second_slot)
+            if not (occupancy.faculty_busy(self.faculty[second]) >> first_slot) & 1:
+                new_second_room = self._free_room(second, first_slot)
+            if new_second_room is None:
+                occupancy.release(batch_id, self.faculty[first], new_first_room, second_slot)
+            else:
+                occupancy.occupy(batch_id, self.faculty[second], new_second_room, first_slot)
+        if new_second_room is None:
+            occupancy.occupy(batch_id, self.faculty[first], first_room, first_slot)
+            occupancy.occupy(batch_id, self.faculty[second], second_room, second_slot)
+            return None
+
+        # The batch keeps the same slots, so its gaps are unchanged
+        weights = self.WEIGHTS
+        first_day, second_day = first_slot // self.slots_per_day, second_slot // self.slots_per_day
+        clustering = 0
+        if self.subject[first] != self.subject[second]:
+            clustering = (self._shift_subject_day(first, first_day, second_day) +
+                          self._shift_subject_day(second, second_day, first_day))
+        delta = (weights["subject_clustering"] * clustering +
+                 weights["preferred_slot_violations"] * (
+                     self._misses_preference(first, second_slot) + self._misses_preference(second, first_slot) -
+                     self._misses_preference(first, first_slot) - self._misses_preference(second, second_slot)) +
+                 weights["room_type_mismatches"] * (
+                     self._room_mismatch(first, new_first_room) + self._room_mismatch(second, new_second_room) -
+                     self._room_mismatch(first, first_room) - self._room_mismatch(second, second_room)))
+        if not self._accept(delta, temperature):
+            if self.subject[first] != self.subject[second]:
+                self._shift_subject_day(first, second_day, first_day)
+                self._shift_subject_day(second, first_day, second_day)
+            occupancy.release(batch_id, self.faculty[first], new_first_room, second_slot)
+            occupancy.release(batch_id, self.faculty[second], new_second_room, first_slot)
+            occupancy.occupy(batch_id, self.faculty[first], first_room, first_slot)
+            occupancy.occupy(batch_id, self.faculty[second], second_room, second_slot)
+            return None
+        self.slot[first], self.room[first] = second_slot, new_first_room
+        self.slot[second], self.room[second] = first_slot, new_second_room
+        return delta
+
+    def _restore(self, slots: List[int], rooms: List[str]):
+        for session in range(len(self.slot)):
+            self.occupancy.release(self.batch[session], self.faculty[session], self.room[session], self.slot[session])
+        for session in range(len(self.slot)):
+            self.occupancy.occupy(self.batch[session], self.faculty[session], rooms[session], slots[session])
+            self._shift_subject_day(session, self.slot[session] // self.slots_per_day,
+                                    slots[session] // self.slots_per_day)
+        self.slot, self.room = list(slots), list(rooms)
+
+    def entries(self) -> List[tuple]:
+        """Current (batch_id, subject_id, faculty_id, room_id, slot_index) for every session"""
+        return list(zip(self.batch, self.subject, self.faculty, self.room, self.slot))
+
 class TimetableGenerator:
     def __init__(self):
         self.time_slots = self._generate_time_slots()
+        # Slot ids are regenerated per process, so stored entries are located by day and start time
+        self.slot_lookup = {(slot.day.value, slot.start_time): slot.slot_number - 1
+                            for slot in self.time_slots}
     
     def _generate_time_slots(self):
         """Generate standard time slots"""
@@ -192,15 +908,67 @@ class TimetableGenerator:
         
         return slots
     
-    async def generate_timetable(self, department: str, semester: int):
+    async def generate_timetable(self, department: str, semester: int,
+                                 engine: SolverEngine = SolverEngine.GREEDY, optimize_ms: int = 0,
+                                 seed: Optional[int] = None, diagnostics: bool = False):
         """Generate optimized timetable for a department and semester"""
+        started = perf_counter()
         
         # Fetch required data
-        batches = await db.batches.find({"department": department, "semester": semester}).to_list(100)
-        subjects = await db.subjects.find({"department": department, "semester": semester}).to_list(100)
-        faculty = await db.faculty.find({"department": department}).to_list(100)
-        rooms = await db.rooms.find({"available": True}).to_list(100)
+        inputs = await self.fetch_inputs([(department, semester)])
+        batches, subjects, faculty, rooms = self.check_inputs(inputs[(department, semester)])
+        fetched = perf_counter()
+        occupancy = await campus_occupancy.seed((department, semester))
+        seeded = perf_counter()
         
+        # Seeded runs are reproducible, so they are cached by input fingerprint; diagnostics always solve
+        cache_key = None
+        if seed is not None:
+            cache_key = generation_fingerprint(department, semester, inputs[(department, semester)],
+                                               occupancy, engine, seed, optimize_ms)
+            cached = None if diagnostics else await load_cached_timetable(cache_key)
+            if cached:
+                return cached
+        
+        # Solve off the event loop so other requests keep being served
+        timetable = await run_in_process_pool(
+            solve_department, department, semester, batches, subjects, faculty, rooms, engine, occupancy,
+            None, optimize_ms, seed, diagnostics
+        )
+        if diagnostics:
+            timetable.solver_stats["diagnostics"]["phases_ms"] = {
+                "fetch": round((fetched - started) * 1000, 3),
+                "occupancy": round((seeded - fetched) * 1000, 3),
+                **timetable.solver_stats["diagnostics"]["phases_ms"],
+            }
+        if cache_key and not diagnostics:
+            await store_cached_timetable(cache_key, timetable)
+        return timetable
+    
+    async def fetch_inputs(self, targets: List[tuple]) -> Dict[tuple, tuple]:
+        """Fetch (batches, subjects, faculty, rooms) for each target with one query per collection"""
+        departments = sorted({department for department, _ in targets})
+        scopes = [{"department": department, "semester": semester} for department, semester in targets]
+        
+        batches = await db.batches.find({"$or": scopes}, {"_id": 0}).to_list(None)
+        subjects = await db.subjects.find({"$or": scopes}, {"_id": 0}).to_list(None)
+        faculty = await db.faculty.find({"department": {"$in": departments}}, {"_id": 0}).to_list(None)
+        rooms = await db.rooms.find({"available": True}, {"_id": 0}).to_list(None)
+        
+        # Targets share the room pool and their department's faculty
+        inputs = {}
+        for department, semester in targets:
+            inputs[(department, semester)] = (
+                [b for b in batches if b["department"] == department and b["semester"] == semester],
+                [s for s in subjects if s["department"] == department and s["semester"] == semester],
+                [f for f in faculty if f["department"] == department],
+                rooms,
+            )
+        return inputs
+    
+    def check_inputs(self, inputs: tuple) -> tuple:
+        """Raise a 400 naming whatever the generator is missing"""
+        batches, subjects, faculty, rooms = inputs
         if not batches or not subjects or not faculty or not rooms:
             missing_data = []
             if not batches: missing_data.append("batches")
@@ -212,12 +980,219 @@ class TimetableGenerator:
                 status_code=400, 
                 detail=f"Insufficient data for timetable generation. Missing: {', '.join(missing_data)}"
             )
+        return inputs
+    
+    def solve(self, department: str, semester: int, batches, subjects, faculty, rooms,
+              engine: SolverEngine = SolverEngine.GREEDY,
+              occupancy: Optional[SlotOccupancy] = None, progress=None, optimize_ms: int = 0,
+              seed: Optional[int] = None, diagnostics: bool = False):
+        """Build a timetable from already-fetched documents (no database access)"""
+        started = perf_counter()
+        rng = random.Random(seed)
+        collector = SolverDiagnostics() if diagnostics else None
+        if occupancy is None:
+            occupancy = SlotOccupancy()
+        preferred = self.apply_faculty_constraints(faculty, occupancy)
+        phase_started = perf_counter()
+        
+        hours_required = sum(
+            s["hours_per_week"]
+            for batch_data in batches for s in subjects if s["id"] in batch_data["subjects"]
+        )
+        report = None
+        if progress is not None:
+            # progress.update(entries_placed, hours_unscheduled) may raise GenerationCancelled
+            report = lambda placed: progress.update(placed, hours_required - placed)
+        
+        if engine == SolverEngine.CSP:
+            timetable_entries, nodes_explored = self._solve_csp(batches, subjects, faculty, rooms, occupancy,
+                                                                report, preferred=preferred, diagnostics=collector)
+        else:
+            timetable_entries, nodes_explored = self._solve_greedy(batches, subjects, faculty, rooms, occupancy,
+                                                                   report, preferred=preferred, rng=rng,
+                                                                   diagnostics=collector)
+        if collector:
+            collector.phases_ms["constraints"] = (phase_started - started) * 1000
+            collector.phases_ms["search"] = (perf_counter() - phase_started) * 1000
+        
+        optimization = None
+        if optimize_ms > 0:
+            optimize_report = None
+            if progress is not None:
+                optimize_report = lambda: progress.update(len(timetable_entries),
+                                                          hours_required - len(timetable_entries))
+            # Seeded runs anneal for a fixed number of moves so the result depends only on the inputs
+            move_budget = optimize_ms * OPTIMIZER_MOVES_PER_MS if seed is not None else None
+            timetable_entries, optimization = self.optimize(timetable_entries, batches, subjects, rooms,
+                                                            occupancy, preferred, optimize_ms, optimize_report, rng,
+                                                            move_budget)
+        
+        # Create timetable object
+        timetable = Timetable(
+            name=f"{department} - Semester {semester} Timetable",
+            department=department,
+            semester=semester,
+            entries=timetable_entries,
+            solver_stats={
+                "engine": engine.value,
+                "seed": seed,
+                "solve_time_ms": round((perf_counter() - started) * 1000, 3),
+                "nodes_explored": nodes_explored,
+                "hours_required": hours_required,
+                "unscheduled_hours": hours_required - len(timetable_entries),
+                "undersized_room_entries": self._count_undersized(timetable_entries, batches, rooms),
+                "faculty_load": self.faculty_load_report(timetable_entries, faculty, preferred),
+            }
+        )
+        if optimization:
+            timetable.solver_stats["optimization"] = optimization
+            if collector:
+                collector.phases_ms["optimize"] = optimization["elapsed_ms"]
+        
+        stats = timetable.solver_stats
+        logger.info("Solved %s semester %s with %s in %.1f ms: %d/%d hours scheduled",
+                    department, semester, engine.value, stats["solve_time_ms"],
+                    hours_required - stats["unscheduled_hours"], hours_required)
+        if collector:
+            stats["diagnostics"] = collector.as_dict()
+            logger.info("Diagnostics for %s semester %s: %d attempts, %d conflict checks, rejections %s, "
+                        "bottleneck %s", department, semester, collector.placement_attempts,
+                        collector.conflict_checks, collector.rejections, stats["diagnostics"]["bottleneck"])
+        return timetable
+    
+    def optimize(self, entries, batches, subjects, rooms, occupancy: SlotOccupancy,
+                 preferred: Dict[str, int], time_budget_ms: int, report=None,
+                 rng: Optional[random.Random] = None, move_budget: Optional[int] = None) -> tuple:
+        """Improve soft-constraint cost of placed entries; returns (entries, optimization stats)"""
+        started = perf_counter()
+        room_index = RoomIndex(rooms)
+        room_is_lab = {r["id"]: r["room_type"] == "Laboratory" for r in rooms}
+        batch_by_id = {b["id"]: b for b in batches}
+        subject_by_id = {s["id"]: s for s in subjects}
+        sessions = []
+        for entry in entries:
+            batch_data, subject_data = batch_by_id[entry.batch_id], subject_by_id[entry.subject_id]
+            requires_lab = subject_data.get("requires_lab", False)
+            sessions.append((
+                entry.batch_id, entry.subject_id, entry.faculty_id, entry.room_id,
+                self.slot_lookup[(DayOfWeek(entry.day).value, entry.start_time)],
+                requires_lab,
+                room_index.candidates(requires_lab, batch_data.get("student_count", 0),
+                                      subject_data.get("required_equipment", [])),
+            ))
+        
+        optimizer = TimetableOptimizer(occupancy, sessions, len(self.time_slots),
+                                       len(self.time_slots) // len(DayOfWeek), preferred, room_is_lab, room_index,
+                                       rng=rng, report=report)
+        objective_before = optimizer.score()
+        optimizer.run(time_budget_ms, move_budget)
+        elapsed = perf_counter() - started
+        optimized_entries = [self._make_entry(batch_id, subject_id, faculty_id, room_id, self.time_slots[slot_index])
+                             for batch_id, subject_id, faculty_id, room_id, slot_index in optimizer.entries()]
+        return optimized_entries, {
+            "time_budget_ms": time_budget_ms,
+            "move_budget": move_budget,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "moves_tried": optimizer.moves_tried,
+            "moves_accepted": optimizer.moves_accepted,
+            "moves_per_second": round(optimizer.moves_tried / elapsed) if elapsed else 0,
+            "weights": dict(TimetableOptimizer.WEIGHTS),
+            "objective_before": objective_before,
+            "objective_after": optimizer.score(),
+        }
+    
+    def slot_mask(self, specs: List[str]) -> int:
+        """Slots matching specs such as "Monday", "Monday 09:00", "14:00-17:00" or "Friday 14:00-17:00", as a bitmask"""
+        days = {day.value.lower(): day.value for day in DayOfWeek}
+        mask = 0
+        for spec in specs:
+            day = start = end = None
+            for token in spec.replace(",", " ").split():
+                if token.lower() in days:
+                    day = days[token.lower()]
+                elif "-" in token:
+                    start, end = token.split("-", 1)
+                else:
+                    start = end = token
+            if day is None and start is None:
+                continue  # unrecognised spec
+            for slot in self.time_slots:
+                if day is not None and slot.day.value != day:
+                    continue
+                # A time range matches the slots starting inside it
+                if start is not None and not (slot.start_time == start or start <= slot.start_time < end):
+                    continue
+                mask |= 1 << (slot.slot_number - 1)
+        return mask
+    
+    def apply_faculty_constraints(self, faculty, occupancy: SlotOccupancy) -> Dict[str, int]:
+        """Register hour caps and unavailable slots as hard constraints; return preferred-slot masks"""
+        slots_per_day = len(self.time_slots) // len(DayOfWeek)
+        preferred = {}
+        for faculty_member in faculty:
+            occupancy.limit_faculty(
+                faculty_member["id"],
+                faculty_member.get("max_hours_per_day", 6),
+                faculty_member.get("max_hours_per_week", 30),
+                slots_per_day,
+                len(DayOfWeek),
+                unavailable=self.slot_mask(faculty_member.get("unavailable_slots", [])),
+            )
+            preferred[faculty_member["id"]] = self.slot_mask(faculty_member.get("preferred_time_slots", []))
+        return preferred
+    
+    def faculty_load_report(self, entries, faculty, preferred: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Per-faculty hours this week, busiest day and preferred-slot hits for a set of entries"""
+        slots_per_day = len(self.time_slots) // len(DayOfWeek)
+        load = {f["id"]: [0] * len(DayOfWeek) for f in faculty}
+        preferred_hits = {f["id"]: 0 for f in faculty}
+        for entry in entries:
+            if entry.faculty_id not in load:
+                continue
+            slot_index = self.slot_lookup[(DayOfWeek(entry.day).value, entry.start_time)]
+            load[entry.faculty_id][slot_index // slots_per_day] += 1
+            if (preferred.get(entry.faculty_id, 0) >> slot_index) & 1:
+                preferred_hits[entry.faculty_id] += 1
         
-        # Initialize timetable entries
+        report = []
+        for faculty_member in faculty:
+            days = load[faculty_member["id"]]
+            report.append({
+                "faculty_id": faculty_member["id"],
+                "name": faculty_member.get("name"),
+                "hours_per_week": sum(days),
+                "max_hours_per_week": faculty_member.get("max_hours_per_week", 30),
+                "busiest_day_hours": max(days),
+                "max_hours_per_day": faculty_member.get("max_hours_per_day", 6),
+                "preferred_slot_hours": (preferred_hits[faculty_member["id"]]
+                                         if preferred.get(faculty_member["id"]) else None),
+            })
+        return report
+    
+    def _pick_faculty(self, available_faculty, occupancy: SlotOccupancy, slot_index: int,
+                      preferred: Dict[str, int], rng: random.Random):
+        """Random free faculty member for the slot, preferring those who asked for it"""
+        free = [f for f in available_faculty if not (occupancy.faculty_busy(f["id"]) >> slot_index) & 1]
+        if not free:
+            return None
+        preferring = [f for f in free if (preferred.get(f["id"], 0) >> slot_index) & 1]
+        return rng.choice(preferring or free)
+    
+    def _solve_greedy(self, batches, subjects, faculty, rooms, occupancy, report=None,
+                      preferred: Optional[Dict[str, int]] = None, rng: Optional[random.Random] = None,
+                      diagnostics: Optional[SolverDiagnostics] = None):
+        """Single greedy pass over batches and subjects; returns (entries, placement attempts)"""
         timetable_entries = []
+        total_attempts = 0
+        room_index = RoomIndex(rooms)
+        preferred = preferred or {}
+        rng = rng or random.Random()
+        full_mask = (1 << len(self.time_slots)) - 1
         
         # Create a constraint solver
         for batch_data in batches:
+            batch_started = perf_counter()
+            batch_entries = len(timetable_entries)
             batch_subjects = [s for s in subjects if s["id"] in batch_data["subjects"]]
             
             for subject_data in batch_subjects:
@@ -225,12 +1200,18 @@ class TimetableGenerator:
                 available_faculty = [f for f in faculty if subject_data["id"] in f.get("subjects", [])]
                 
                 if not available_faculty:
-                    print(f"Warning: No faculty available for subject {subject_data['name']} ({subject_data['code']})")
+                    logger.warning("No faculty available for subject %s (%s)",
+                                   subject_data['name'], subject_data['code'])
+                    if diagnostics:
+                        diagnostics.shortfall(batch_data, subject_data, 0, subject_data["hours_per_week"])
                     continue
                 
                 # Generate entries based on hours per week
                 hours_needed = subject_data["hours_per_week"]
                 assigned_hours = 0
+                candidate_rooms = room_index.candidates(subject_data.get("requires_lab", False),
+                                                        batch_data.get("student_count", 0),
+                                                        subject_data.get("required_equipment", []))
                 
                 # Enhanced scheduling algorithm with better distribution
                 attempts = 0
@@ -243,177 +1224,1138 @@ class TimetableGenerator:
                     attempts += 1
                     
                     # Check if slot is available for batch, faculty, and room
-                    faculty_member = random.choice(available_faculty)
-                    room = self._find_available_room(rooms, subject_data.get("requires_lab", False))
+                    faculty_member = self._pick_faculty(available_faculty, occupancy, slot.slot_number - 1,
+                                                        preferred, rng)
+                    room_id = self._find_available_room(room_index, candidate_rooms, occupancy, slot)
+                    
+                    if diagnostics:
+                        rooms_checked = candidate_rooms.index(room_id) + 1 if room_id else len(candidate_rooms)
+                        diagnostics.conflict_checks += 1 + len(available_faculty) + rooms_checked
                     
-                    if room and self._is_slot_available(timetable_entries, batch_data["id"], 
-                                                      faculty_member["id"], room["id"], slot):
-                        entry = TimetableEntry(
-                            batch_id=batch_data["id"],
-                            subject_id=subject_data["id"],
-                            faculty_id=faculty_member["id"],
-                            room_id=room["id"],
-                            time_slot_id=slot.id,
-                            day=slot.day,
-                            start_time=slot.start_time,
-                            end_time=slot.end_time
-                        )
-                        timetable_entries.append(entry)
+                    if faculty_member and room_id and self._is_slot_available(occupancy, batch_data["id"], 
+                                                         faculty_member["id"], room_id, slot):
+                        timetable_entries.append(self._make_entry(
+                            batch_data["id"], subject_data["id"], faculty_member["id"], room_id, slot
+                        ))
+                        occupancy.occupy(batch_data["id"], faculty_member["id"], room_id,
+                                         slot.slot_number - 1)
                         assigned_hours += 1
+                    elif diagnostics:
+                        if (occupancy.batches.get(batch_data["id"], 0) >> (slot.slot_number - 1)) & 1:
+                            diagnostics.rejections["batch"] += 1
+                        elif not faculty_member:
+                            diagnostics.rejections["faculty"] += 1
+                        else:
+                            diagnostics.rejections["room"] += 1
+                
+                total_attempts += attempts
+                if report:
+                    report(len(timetable_entries))
                         
                 # Log scheduling results
                 if assigned_hours < hours_needed:
-                    print(f"Warning: Could only schedule {assigned_hours}/{hours_needed} hours for {subject_data['name']} in batch {batch_data['name']}")
+                    logger.warning("Could only schedule %d/%d hours for %s in batch %s",
+                                   assigned_hours, hours_needed, subject_data['name'], batch_data['name'])
+                    if diagnostics:
+                        diagnostics.shortfall(batch_data, subject_data, assigned_hours, hours_needed,
+                                              diagnostics.blocked_slots(occupancy, batch_data["id"],
+                                                                        [f["id"] for f in available_faculty],
+                                                                        candidate_rooms, full_mask))
+            
+            if diagnostics:
+                diagnostics.batches.append({
+                    "batch_id": batch_data["id"],
+                    "batch": batch_data.get("name"),
+                    "solve_ms": round((perf_counter() - batch_started) * 1000, 3),
+                    "hours_required": sum(s["hours_per_week"] for s in batch_subjects),
+                    "hours_scheduled": len(timetable_entries) - batch_entries,
+                })
         
-        # Create timetable object
-        timetable = Timetable(
-            name=f"{department} - Semester {semester} Timetable",
-            department=department,
-            semester=semester,
-            entries=timetable_entries
-        )
+        if diagnostics:
+            diagnostics.placement_attempts = total_attempts
+        return timetable_entries, total_attempts
+    
+    def repair(self, timetable: Dict[str, Any], batches, subjects, faculty, rooms,
+               delta: "TimetableDelta", occupancy: SlotOccupancy) -> Timetable:
+        """Rip up entries touched by ``delta`` and re-solve only those sessions"""
+        started = perf_counter()
+        faculty = [f for f in faculty if f["id"] not in delta.unavailable_faculty_ids]
+        preferred = self.apply_faculty_constraints(faculty, occupancy)
+        rooms = [r for r in rooms if r["id"] not in delta.unavailable_room_ids]
+        faculty_ids = {f["id"] for f in faculty}
+        room_ids = {r["id"] for r in rooms}
+        changed_subjects = set(delta.changed_subject_ids)
         
-        return timetable
+        # Entries whose faculty or room left the pools, or whose subject changed; the rest stay put
+        def touched(entry):
+            return (entry["faculty_id"] not in faculty_ids or entry["room_id"] not in room_ids or
+                    entry["subject_id"] in changed_subjects)
+        
+        hours_by_batch = {
+            batch_data["id"]: sum(s["hours_per_week"] for s in subjects if s["id"] in batch_data["subjects"])
+            for batch_data in batches
+        }
+        hours_required = sum(hours_by_batch.values())
+        
+        def attempt(ripped_batches):
+            local = occupancy.copy()
+            kept_entries = []
+            scheduled: Dict[tuple, int] = {}
+            for entry in timetable["entries"]:
+                if touched(entry) or entry["batch_id"] in ripped_batches:
+                    continue
+                kept_entries.append(TimetableEntry(**entry))
+                slot_index = self.slot_lookup[(entry["day"], entry["start_time"])]
+                local.occupy(entry["batch_id"], entry["faculty_id"], entry["room_id"], slot_index)
+                key = (entry["batch_id"], entry["subject_id"])
+                scheduled[key] = scheduled.get(key, 0) + 1
+            new_entries, nodes = self._solve_csp(batches, subjects, faculty, rooms, local,
+                                                 scheduled=scheduled, log_shortfalls=False,
+                                                 preferred=preferred)
+            return kept_entries, new_entries, nodes
+        
+        kept_entries, new_entries, nodes_explored = attempt(set())
+        placed_by_batch: Dict[str, int] = {}
+        for entry in kept_entries + new_entries:
+            placed_by_batch[entry.batch_id] = placed_by_batch.get(entry.batch_id, 0) + 1
+        short_batches = {batch_id for batch_id, hours in hours_by_batch.items()
+                         if placed_by_batch.get(batch_id, 0) < hours}
+        # Fixed entries left no room for some sessions: rip up every entry of the short batches once
+        widened = False
+        if short_batches:
+            wider = attempt(short_batches)
+            nodes_explored += wider[2]
+            if len(wider[0]) + len(wider[1]) > len(kept_entries) + len(new_entries):
+                kept_entries, new_entries, _ = wider
+                widened = True
+        
+        entries = kept_entries + new_entries
+        return Timetable(**{**timetable, "entries": entries, "solver_stats": {
+            "engine": "repair",
+            "solve_time_ms": round((perf_counter() - started) * 1000, 3),
+            "nodes_explored": nodes_explored,
+            "ripped_up_entries": len(timetable["entries"]) - len(kept_entries),
+            "replaced_entries": len(new_entries),
+            "widened": widened,
+            "hours_required": hours_required,
+            "unscheduled_hours": hours_required - len(entries),
+            "faculty_load": self.faculty_load_report(entries, faculty, preferred),
+        }})
     
-    def _find_available_room(self, rooms, requires_lab: bool):
-        """Find an available room based on requirements"""
-        suitable_rooms = rooms
-        if requires_lab:
-            suitable_rooms = [r for r in rooms if r["room_type"] == "Laboratory"]
+    def _solve_csp(self, batches, subjects, faculty, rooms, occupancy, report=None,
+                   scheduled: Optional[Dict[tuple, int]] = None, log_shortfalls: bool = True,
+                   preferred: Optional[Dict[str, int]] = None, diagnostics: Optional[SolverDiagnostics] = None):
+        """Constraint search over every (batch, subject) pair; returns (entries, search nodes)"""
+        # (batch_id, subject_id) -> hours already placed elsewhere, subtracted from hours_per_week
+        scheduled = scheduled or {}
+        preferred = preferred or {}
+        room_index = RoomIndex(rooms)
+        
+        groups = []
+        for batch_data in batches:
+            for subject_data in subjects:
+                if subject_data["id"] not in batch_data["subjects"]:
+                    continue
+                faculty_ids = [f["id"] for f in faculty if subject_data["id"] in f.get("subjects", [])]
+                if not faculty_ids and log_shortfalls:
+                    logger.warning("No faculty available for subject %s (%s)",
+                                   subject_data['name'], subject_data['code'])
+                room_key = (subject_data.get("requires_lab", False), batch_data.get("student_count", 0),
+                            tuple(sorted(subject_data.get("required_equipment", []))))
+                group_preferences = {f: preferred[f] for f in faculty_ids if preferred.get(f)}
+                preferred_mask = 0
+                for mask in group_preferences.values():
+                    preferred_mask |= mask
+                groups.append({
+                    "index": len(groups),
+                    "batch": batch_data,
+                    "subject": subject_data,
+                    "batch_id": batch_data["id"],
+                    "faculty_ids": faculty_ids,
+                    "faculty_key": subject_data["id"],
+                    "room_ids": room_index.candidates(*room_key),
+                    "room_key": room_key,
+                    "preferred": group_preferences,
+                    "preferred_mask": preferred_mask,
+                    "hours": max(0, subject_data["hours_per_week"] -
+                                 scheduled.get((batch_data["id"], subject_data["id"]), 0)),
+                })
+        
+        solver = CSPSolver(occupancy, len(self.time_slots), len(self.time_slots) // len(DayOfWeek),
+                           report=report, diagnostics=diagnostics)
+        placements = solver.solve(groups)
         
-        return suitable_rooms[0] if suitable_rooms else None
+        scheduled_hours = [0] * len(groups)
+        timetable_entries = []
+        for group_index, slot_index, faculty_id, room_id in sorted(placements, key=lambda p: (p[0], p[1])):
+            group = groups[group_index]
+            scheduled_hours[group_index] += 1
+            timetable_entries.append(self._make_entry(
+                group["batch_id"], group["subject"]["id"], faculty_id, room_id, self.time_slots[slot_index]
+            ))
+        
+        for group, assigned_hours in zip(groups, scheduled_hours):
+            if assigned_hours >= group["hours"]:
+                continue
+            if log_shortfalls and group["faculty_ids"]:
+                logger.warning("Could only schedule %d/%d hours for %s in batch %s",
+                               assigned_hours, group["hours"], group["subject"]["name"], group["batch"]["name"])
+            if diagnostics:
+                diagnostics.shortfall(group["batch"], group["subject"], assigned_hours, group["hours"],
+                                      diagnostics.blocked_slots(occupancy, group["batch_id"], group["faculty_ids"],
+                                                                group["room_ids"], solver.full_mask))
+        
+        if diagnostics:
+            # Pairs are searched jointly, so per-batch results carry no solve time
+            diagnostics.placement_attempts = solver.nodes + solver.filled
+            placed_by_batch: Dict[str, int] = {}
+            for entry in timetable_entries:
+                placed_by_batch[entry.batch_id] = placed_by_batch.get(entry.batch_id, 0) + 1
+            for batch_data in batches:
+                diagnostics.batches.append({
+                    "batch_id": batch_data["id"],
+                    "batch": batch_data.get("name"),
+                    "hours_required": sum(group["hours"] for group in groups if group["batch_id"] == batch_data["id"]),
+                    "hours_scheduled": placed_by_batch.get(batch_data["id"], 0),
+                })
+        
+        return timetable_entries, solver.nodes
+    
+    def _count_undersized(self, entries, batches, rooms) -> int:
+        """Entries placed in a room with fewer seats than the batch has students"""
+        capacity = {r["id"]: r.get("capacity", 0) for r in rooms}
+        students = {b["id"]: b.get("student_count", 0) for b in batches}
+        return sum(1 for e in entries if capacity.get(e.room_id, 0) < students.get(e.batch_id, 0))
     
-    def _is_slot_available(self, existing_entries, batch_id, faculty_id, room_id, slot):
+    def _make_entry(self, batch_id, subject_id, faculty_id, room_id, slot):
+        return TimetableEntry(
+            batch_id=batch_id,
+            subject_id=subject_id,
+            faculty_id=faculty_id,
+            room_id=room_id,
+            time_slot_id=slot.id,
+            day=slot.day,
+            start_time=slot.start_time,
+            end_time=slot.end_time
+        )
+    
+    def _find_available_room(self, room_index: RoomIndex, candidates: List[str],
+                             occupancy: SlotOccupancy, slot):
+        """Smallest suitable room that is free in the slot"""
+        return room_index.best_fit(candidates, occupancy, slot.slot_number - 1)
+    
+    def _is_slot_available(self, occupancy, batch_id, faculty_id, room_id, slot):
         """Check if a time slot is available for batch, faculty, and room"""
-        for entry in existing_entries:
-            if (entry.day == slot.day and entry.start_time == slot.start_time and
-                (entry.batch_id == batch_id or entry.faculty_id == faculty_id or entry.room_id == room_id)):
-                return False
-        return True
+        return occupancy.is_free(batch_id, faculty_id, room_id, slot.slot_number - 1)
 
 # Initialize timetable generator
 timetable_generator = TimetableGenerator()
 
+# Process pool for CPU-bound solving, created on first use. Workers are
+# spawned rather than forked so they never inherit the Motor client's threads.
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        workers = int(os.environ.get('GENERATION_WORKERS', os.cpu_count() or 1))
+        _process_pool = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+async def run_in_process_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+def solve_department(department: str, semester: int, batches, subjects, faculty, rooms,
+                     engine: SolverEngine = SolverEngine.GREEDY,
+                     occupancy: Optional[SlotOccupancy] = None, progress=None,
+                     optimize_ms: int = 0, seed: Optional[int] = None, diagnostics: bool = False) -> Timetable:
+    """Process-pool entry point: solve one department/semester from prefetched documents"""
+    return timetable_generator.solve(department, semester, batches, subjects, faculty, rooms,
+                                     engine=engine, occupancy=occupancy, progress=progress,
+                                     optimize_ms=optimize_ms, seed=seed, diagnostics=diagnostics)
+
+# Campus-wide occupancy
+class CampusOccupancy:
+    """Faculty and room bitmasks held by the active timetable of every department/semester"""
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self.scopes: Dict[tuple, tuple] = {}
+        self.loaded = False
+        self.version = 0
+        self.expires = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    async def current_version() -> int:
+        state = await db.campus_occupancy_version.find_one({"id": "campus"}, {"_id": 0, "version": 1})
+        return state["version"] if state else 0
+
+    async def ensure_loaded(self):
+        # Reload when another API worker bumped the version, or after the TTL for writes made outside the API
+        version = await self.current_version()
+        if self.loaded and self.version == version and perf_counter() < self.expires:
+            return
+        async with self._lock:
+            if self.loaded and self.version == version and perf_counter() < self.expires:
+                return
+            pointers = await db.active_timetables.find(
+                {}, {"_id": 0, "timetable_id": 1, "department": 1, "semester": 1}
+            ).to_list(None)
+            entries = await db.timetable_entries.find(
+                {"timetable_id": {"$in": [pointer["timetable_id"] for pointer in pointers]}},
+                {"_id": 0, "timetable_id": 1, "faculty_id": 1, "room_id": 1, "day": 1, "start_time": 1}
+            ).to_list(None)
+            entries_by_timetable: Dict[str, list] = {}
+            for entry in entries:
+                entries_by_timetable.setdefault(entry["timetable_id"], []).append(entry)
+            self.scopes = {}
+            for pointer in pointers:
+                self.set_scope(pointer["department"], pointer["semester"],
+                               entries_by_timetable.get(pointer["timetable_id"], []))
+            self.version = version
+            self.expires = perf_counter() + self.ttl_seconds
+            self.loaded = True
+
+    async def changed(self):
+        """Record that active timetables changed; call after updating this worker's index in place"""
+        state = await db.campus_occupancy_version.find_one_and_update(
+            {"id": "campus"}, {"$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        if self.loaded and state["version"] == self.version + 1:
+            self.version = state["version"]  # only our own change happened since the last load
+        else:
+            self.loaded = False
+
+    @staticmethod
+    def masks_for(entries) -> tuple:
+        """Return (faculty masks, room masks) for timetable entries (models or documents)"""
+        faculty: Dict[str, int] = {}
+        rooms: Dict[str, int] = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                entry = entry.dict()
+            day = entry["day"].value if isinstance(entry["day"], DayOfWeek) else entry["day"]
+            bit = 1 << timetable_generator.slot_lookup[(day, entry["start_time"])]
+            faculty[entry["faculty_id"]] = faculty.get(entry["faculty_id"], 0) | bit
+            rooms[entry["room_id"]] = rooms.get(entry["room_id"], 0) | bit
+        return faculty, rooms
+
+    def set_scope(self, department: str, semester: int, entries):
+        self.scopes[(department, semester)] = self.masks_for(entries)
+
+    def clear_scope(self, department: str, semester: int):
+        self.scopes.pop((department, semester), None)
+
+    def clear(self):
+        self.scopes.clear()
+
+    async def seed(self, scope: tuple, extra: tuple = ()) -> SlotOccupancy:
+        """SlotOccupancy with every other scope's faculty and rooms (plus ``extra`` masks) reserved"""
+        await self.ensure_loaded()
+        occupancy = SlotOccupancy()
+        for other_scope, masks in self.scopes.items():
+            if other_scope != scope:
+                occupancy.reserve(*masks)
+        for masks in extra:
+            occupancy.reserve(*masks)
+        return occupancy
+
+campus_occupancy = CampusOccupancy()
+
+def masks_overlap(first: tuple, second: tuple) -> bool:
+    """True when two (faculty masks, room masks) pairs book a resource in the same slot"""
+    for own, other in zip(first, second):
+        for resource_id, mask in own.items():
+            if mask & other.get(resource_id, 0):
+                return True
+    return False
+
+def exceeds_faculty_caps(masks: tuple, earlier: List[tuple], reserved: Dict[str, int], faculty) -> bool:
+    """True when ``masks`` plus earlier targets' and ``reserved`` bookings put a faculty member over a cap"""
+    slots_per_day = len(timetable_generator.time_slots) // len(DayOfWeek)
+    day_mask = (1 << slots_per_day) - 1
+    for faculty_member in faculty:
+        faculty_id = faculty_member["id"]
+        others = 0
+        for faculty_masks, _ in earlier:
+            others |= faculty_masks.get(faculty_id, 0)
+        if not others or faculty_id not in masks[0]:
+            continue
+        busy = masks[0][faculty_id] | others | reserved.get(faculty_id, 0)
+        if busy.bit_count() > faculty_member.get("max_hours_per_week", 30):
+            return True
+        max_per_day = faculty_member.get("max_hours_per_day", 6)
+        if any(((busy >> (day * slots_per_day)) & day_mask).bit_count() > max_per_day
+               for day in range(len(DayOfWeek))):
+            return True
+    return False
+
+# Timetable storage
+# Timetable documents hold metadata and an entry_count; their entries live in
+# timetable_entries (one document per entry, tagged with timetable_id) so
+# per-batch/faculty/room reads are index scans and large departments stay
+# far below the 16 MB document limit.
+ENTRY_PROJECTION = {"_id": 0, "timetable_id": 0}
+
+def _timetable_documents(timetable: Timetable) -> tuple:
+    document = timetable.dict(exclude={"entries"})
+    document["entry_count"] = len(timetable.entries)
+    entries = [{**entry.dict(), "timetable_id": timetable.id} for entry in timetable.entries]
+    return document, entries
+
+async def save_timetables(timetables: List[Timetable]):
+    documents, entries = [], []
+    for timetable in timetables:
+        document, timetable_entries = _timetable_documents(timetable)
+        documents.append(document)
+        entries.extend(timetable_entries)
+    if entries:
+        await db.timetable_entries.insert_many(entries)
+    if documents:
+        await db.timetables.insert_many(documents)
+
+async def save_timetable(timetable: Timetable):
+    await save_timetables([timetable])
+
+async def load_timetable(timetable_id: str, **query) -> Optional[Dict[str, Any]]:
+    """Timetable document with its entries attached, or None"""
+    timetable = await db.timetables.find_one({"id": timetable_id, **query}, {"_id": 0})
+    if timetable:
+        timetable["entries"] = await db.timetable_entries.find(
+            {"timetable_id": timetable_id}, ENTRY_PROJECTION
+        ).to_list(None)
+    return timetable
+
+async def replace_timetable_entries(timetable_id: str, entries: List[TimetableEntry], **fields):
+    await db.timetable_entries.delete_many({"timetable_id": timetable_id})
+    if entries:
+        await db.timetable_entries.insert_many([{**entry.dict(), "timetable_id": timetable_id} for entry in entries])
+    await db.timetables.update_one({"id": timetable_id}, {"$set": {"entry_count": len(entries), **fields}})
+
+async def delete_timetables(query: Dict[str, Any]) -> int:
+    timetable_ids = await db.timetables.distinct("id", query)
+    if timetable_ids:
+        await db.timetable_entries.delete_many({"timetable_id": {"$in": timetable_ids}})
+        await db.active_timetables.delete_many({"timetable_id": {"$in": timetable_ids}})
+    result = await db.timetables.delete_many({"id": {"$in": timetable_ids}})
+    return result.deleted_count
+
+# One active_timetables pointer per (department, semester) names the active
+# timetable. Moving the pointer is a single-document write, so readers always
+# resolve exactly one version; the is_active flags on timetable documents
+# follow it for listings.
+async def active_timetable_id(department: str, semester: int) -> Optional[str]:
+    pointer = await db.active_timetables.find_one(
+        {"department": department, "semester": semester}, {"_id": 0, "timetable_id": 1}
+    )
+    return pointer["timetable_id"] if pointer else None
+
+async def set_active_timetable(timetable: Dict[str, Any]):
+    """Point the timetable's scope at it, then sync is_active flags in one bulk write"""
+    scope = {"department": timetable["department"], "semester": timetable["semester"]}
+    # The version bump orders the batch view rebuilds of concurrent activations
+    await db.active_timetables.update_one(
+        scope,
+        {"$set": {"timetable_id": timetable["id"], "activated_at": datetime.now(timezone.utc)},
+         "$inc": {"version": 1}},
+        upsert=True
+    )
+    await db.timetables.bulk_write([
+        UpdateMany({**scope, "is_active": True, "id": {"$ne": timetable["id"]}}, {"$set": {"is_active": False}}),
+        UpdateOne({"id": timetable["id"]}, {"$set": {"is_active": True}}),
+    ], ordered=False)
+
+async def migrate_active_pointers() -> int:
+    """Create pointers for scopes whose active timetable predates active_timetables"""
+    # Newest first with $setOnInsert: the newest active timetable wins and existing pointers are kept
+    created = 0
+    active = db.timetables.find({"is_active": True}, {"_id": 0, "id": 1, "department": 1, "semester": 1})
+    async for timetable in active.sort("created_at", -1):
+        result = await db.active_timetables.update_one(
+            {"department": timetable["department"], "semester": timetable["semester"]},
+            {"$setOnInsert": {"timetable_id": timetable["id"], "activated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        created += 1 if result.upserted_id is not None else 0
+    return created
+
+async def migrate_embedded_entries() -> int:
+    """Move entries still embedded in timetable documents into timetable_entries"""
+    # Safe to interrupt and re-run: entries are rewritten before the embedded array is removed
+    migrated = 0
+    async for timetable in db.timetables.find({"entries": {"$exists": True}}, {"_id": 0, "id": 1, "entries": 1}):
+        await db.timetable_entries.delete_many({"timetable_id": timetable["id"]})
+        if timetable["entries"]:
+            await db.timetable_entries.insert_many(
+                [{**entry, "timetable_id": timetable["id"]} for entry in timetable["entries"]]
+            )
+        await db.timetables.update_one(
+            {"id": timetable["id"]},
+            {"$set": {"entry_count": len(timetable["entries"])}, "$unset": {"entries": ""}}
+        )
+        migrated += 1
+    return migrated
+
+# Generation result cache
+def generation_fingerprint(department: str, semester: int, inputs: tuple, occupancy: SlotOccupancy,
+                           engine: SolverEngine, seed: int, optimize_ms: int = 0) -> str:
+    """sha256 over everything a seeded solve depends on, including other departments' bookings"""
+    batches, subjects, faculty, rooms = inputs
+    payload = {
+        "target": [department, semester],
+        "batches": batches,
+        "subjects": subjects,
+        "faculty": faculty,
+        "rooms": rooms,
+        "reserved_faculty": sorted(occupancy.faculty.items()),
+        "reserved_rooms": sorted(occupancy.rooms.items()),
+        "engine": engine.value,
+        "seed": seed,
+        "optimize_ms": optimize_ms,
+        "optimize_moves": optimize_ms * OPTIMIZER_MOVES_PER_MS,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+async def load_cached_timetable(key: str) -> Optional[Timetable]:
+    """Fresh copy (new ids) of the timetable stored under ``key``, if any"""
+    cached = await db.generation_cache.find_one({"key": key}, {"_id": 0, "timetable": 1})
+    if not cached:
+        return None
+    document = cached["timetable"]
+    timetable = Timetable(
+        **{field: value for field, value in document.items()
+           if field not in ("id", "created_at", "is_active", "entries")},
+        entries=[{field: value for field, value in entry.items() if field != "id"}
+                 for entry in document["entries"]],
+    )
+    timetable.solver_stats = {**(timetable.solver_stats or {}), "cache_hit": True}
+    return timetable
+
+async def store_cached_timetable(key: str, timetable: Timetable):
+    await db.generation_cache.update_one({"key": key}, {"$set": {
+        "key": key,
+        "department": timetable.department,
+        "semester": timetable.semester,
+        "timetable": timetable.dict(),
+        "created_at": datetime.now(timezone.utc),
+    }}, upsert=True)
+
+async def invalidate_generation_cache(department: Optional[str] = None, semester: Optional[int] = None):
+    """Drop cached results for a department (optionally one semester), or all of them"""
+    query = {}
+    if department is not None:
+        query["department"] = department
+    if semester is not None:
+        query["semester"] = semester
+    await db.generation_cache.delete_many(query)
+
+# Generation jobs
+class GenerationCancelled(Exception):
+    """Raised inside a solve when its job has been cancelled"""
+
+class JobProgress:
+    """Progress sink passed to a pooled solve, writing to a manager-backed dict the API process polls"""
+
+    def __init__(self, shared, cancel_event, interval: float = 0.2):
+        self.shared = shared
+        self.cancel_event = cancel_event
+        self.interval = interval
+        self._last_flush = 0.0
+
+    def update(self, entries_placed: int, hours_unscheduled: int):
+        # Flush at most every ``interval`` seconds so the solver is not slowed by IPC
+        now = perf_counter()
+        if now - self._last_flush < self.interval:
+            return
+        self._last_flush = now
+        self.shared.update(entries_placed=entries_placed, hours_unscheduled=hours_unscheduled)
+        if self.cancel_event.is_set():
+            raise GenerationCancelled()
+
+JOB_POLL_INTERVAL = 0.5
+JOB_STALE_AFTER_SECONDS = 30
+JOB_SWEEP_INTERVAL = 15
+
+_job_manager = None
+_job_cancel_events: Dict[str, Any] = {}
+_job_tasks: set = set()
+_job_sweeper: Optional[asyncio.Task] = None
+
+def get_job_manager():
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = multiprocessing.get_context("spawn").Manager()
+    return _job_manager
+
+def start_generation_job(job_id: str):
+    task = asyncio.create_task(run_generation_job(job_id))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+async def run_generation_job(job_id: str):
+    """Claim a queued job, solve it in the process pool and record progress in Mongo"""
+    # The task inherited the starting request's context; its queries are not that request's
+    request_metrics.set(None)
+    job = await db.generation_jobs.find_one_and_update(
+        {"id": job_id, "status": JobStatus.QUEUED.value},
+        {"$set": {"status": JobStatus.RUNNING.value, "started_at": datetime.now(timezone.utc),
+                  "heartbeat_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0},
+    )
+    if not job:
+        return  # already claimed, finished or cancelled
+    
+    started = perf_counter()
+    department, semester = job["department"], job["semester"]
+    manager = get_job_manager()
+    shared = manager.dict(entries_placed=0, hours_unscheduled=None)
+    cancel_event = manager.Event()
+    _job_cancel_events[job_id] = cancel_event
+    
+    async def finish(status: JobStatus, **fields):
+        fields.update(dict(shared))
+        await db.generation_jobs.update_one({"id": job_id}, {"$set": {
+            "status": status.value,
+            "elapsed_ms": round((perf_counter() - started) * 1000, 3),
+            "finished_at": datetime.now(timezone.utc),
+            **fields,
+        }})
+    
+    try:
+        inputs = await timetable_generator.fetch_inputs([(department, semester)])
+        batches, subjects, faculty, rooms = timetable_generator.check_inputs(inputs[(department, semester)])
+        occupancy = await campus_occupancy.seed((department, semester))
+        engine = SolverEngine(job["engine"])
+        optimize_ms, seed = job.get("optimize_ms", 0), job.get("seed")
+        
+        cache_key = None
+        timetable = None
+        if seed is not None:
+            cache_key = generation_fingerprint(department, semester, inputs[(department, semester)],
+                                               occupancy, engine, seed, optimize_ms)
+            timetable = await load_cached_timetable(cache_key)
+        
+        if timetable is None:
+            future = asyncio.ensure_future(run_in_process_pool(
+                solve_department, department, semester, batches, subjects, faculty, rooms,
+                engine, occupancy, JobProgress(shared, cancel_event), optimize_ms, seed
+            ))
+            while not future.done():
+                await asyncio.wait([future], timeout=JOB_POLL_INTERVAL)
+                # Cancellation may have been requested through another API worker
+                current = await db.generation_jobs.find_one_and_update(
+                    {"id": job_id},
+                    {"$set": {**dict(shared),
+                              "elapsed_ms": round((perf_counter() - started) * 1000, 3),
+                              "heartbeat_at": datetime.now(timezone.utc)}},
+                    projection={"cancel_requested": 1},
+                )
+                if current and current.get("cancel_requested"):
+                    cancel_event.set()
+            
+            timetable = future.result()
+            if cache_key:
+                await store_cached_timetable(cache_key, timetable)
+        
+        await save_timetable(timetable)
+        shared.update(entries_placed=len(timetable.entries),
+                      hours_unscheduled=timetable.solver_stats["unscheduled_hours"])
+        await finish(JobStatus.COMPLETED, timetable_id=timetable.id)
+    except GenerationCancelled:
+        await finish(JobStatus.CANCELLED)
+    except HTTPException as exc:
+        await finish(JobStatus.FAILED, error=exc.detail)
+    except Exception as exc:
+        logger.exception("Generation job %s failed", job_id)
+        await finish(JobStatus.FAILED, error=str(exc))
+    finally:
+        _job_cancel_events.pop(job_id, None)
+
+# Reference data cache
+class ReferenceCache:
+    """Read-through cache of one reference collection with LRU and TTL eviction"""
+
+    def __init__(self, collection_name: str, max_entries: int = 10000, ttl_seconds: float = 300):
+        self.collection_name = collection_name
+        self.max_entries = max_entries
+        # Expiry makes writes through other API workers visible; writes through this one call invalidate
+        self.ttl_seconds = ttl_seconds
+        # Shared with callers, who must not mutate them
+        self.documents: "OrderedDict[str, tuple]" = OrderedDict()
+        self.queries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, store: OrderedDict, key):
+        cached = store.get(key)
+        if cached is None or cached[0] < perf_counter():
+            if cached is not None:
+                del store[key]
+            self.misses += 1
+            return None
+        store.move_to_end(key)
+        self.hits += 1
+        return cached[1]
+
+    def _store(self, store: OrderedDict, key, value):
+        store[key] = (perf_counter() + self.ttl_seconds, value)
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+
+    async def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([document_id])).get(document_id)
+
+    async def get_many(self, ids) -> Dict[str, Dict[str, Any]]:
+        """Documents for ``ids`` keyed by id; misses are fetched with one ``$in`` query"""
+        found = {}
+        missing = []
+        for document_id in set(ids):
+            document = self._lookup(self.documents, document_id)
+            if document is None:
+                missing.append(document_id)
+            else:
+                found[document_id] = document
+        if missing:
+            documents = await db[self.collection_name].find({"id": {"$in": missing}}, {"_id": 0}).to_list(None)
+            for document in documents:
+                self._store(self.documents, document["id"], document)
+                found[document["id"]] = document
+        return found
+
+    async def find(self, query: Dict[str, Any], limit: int = 100) -> List[Dict[str, Any]]:
+        """Result of ``find(query).sort("id").to_list(limit)``, cached per query"""
+        key = (json.dumps(query, sort_keys=True), limit)
+        documents = self._lookup(self.queries, key)
+        if documents is None:
+            documents = await db[self.collection_name].find(query, {"_id": 0}).sort("id", 1).to_list(limit)
+            self._store(self.queries, key, documents)
+            for document in documents:
+                self._store(self.documents, document["id"], document)
+        return documents
+
+    def invalidate(self):
+        self.documents.clear()
+        self.queries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "documents": len(self.documents),
+            "queries": len(self.queries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+reference_caches = {
+    name: ReferenceCache(name,
+                         max_entries=int(os.environ.get('REFERENCE_CACHE_SIZE', 10000)),
+                         ttl_seconds=float(os.environ.get('REFERENCE_CACHE_TTL_SECONDS', 300)))
+    for name in ("subjects", "faculty", "rooms")
+}
+
+# List pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def _paged_cursor(collection_name: str, query: Dict[str, Any], limit: Optional[int],
+                  stages: Optional[List[Dict[str, Any]]]):
+    if stages:
+        # Joins and shaping run after the page is cut, so matching and ordering stay index-backed
+        pipeline = [{"$match": query}, {"$sort": {"id": 1}}]
+        if limit:
+            pipeline.append({"$limit": limit})
+        return db[collection_name].aggregate(pipeline + stages)
+    cursor = db[collection_name].find(query, {"_id": 0}).sort("id", 1)
+    return cursor.limit(limit) if limit else cursor
+
+async def list_page(collection_name: str, query: Dict[str, Any], response: Response,
+                    after: Optional[str] = None, limit: Optional[int] = None,
+                    cache: Optional[ReferenceCache] = None,
+                    stages: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """One page of documents ordered by ``id``, starting after the ``after`` cursor"""
+    limit = limit or DEFAULT_PAGE_SIZE
+    if after:
+        query = {**query, "id": {"$gt": after}}
+    # ``stages`` are aggregation stages (joins, projections) applied to the page
+    if cache and not stages:
+        documents = await cache.find(query, limit + 1)
+    elif stages:
+        documents = await _paged_cursor(collection_name, query, limit + 1, stages).to_list(None)
+    else:
+        documents = await db[collection_name].find(query, {"_id": 0}).sort("id", 1).to_list(limit + 1)
+    if len(documents) > limit:
+        documents = documents[:limit]
+        # The id to pass as the next ``after``
+        response.headers["X-Next-Cursor"] = documents[-1]["id"]
+    return documents
+
+def due_date_cursor(document: Dict[str, Any]) -> str:
+    """Keyset cursor for lists ordered by (due_date, id)"""
+    return f"{document['due_date'].isoformat()}|{document['id']}"
+
+def after_due_date_cursor(query: Dict[str, Any], after: str) -> Dict[str, Any]:
+    """``query`` narrowed to documents ordered after a ``due_date_cursor``"""
+    try:
+        due_date, document_id = after.rsplit("|", 1)
+        due_date = datetime.fromisoformat(due_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$and": [query, {"$or": [{"due_date": {"$gt": due_date}},
+                                     {"due_date": due_date, "id": {"$gt": document_id}}]}]}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def stream_documents(collection_name: str, query: Dict[str, Any], after: Optional[str] = None,
+                     limit: Optional[int] = None,
+                     stages: Optional[List[Dict[str, Any]]] = None) -> StreamingResponse:
+    """NDJSON response fed straight from the Motor cursor, one document per line"""
+    if after:
+        query = {**query, "id": {"$gt": after}}
+    
+    async def lines():
+        async for document in _paged_cursor(collection_name, query, limit, stages):
+            yield orjson.dumps(document, default=_json_default) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Trusted reads
+# Documents were validated by the models when they were written. With
+# TRUSTED_READS set, read endpoints trim them to the response model's fields
+# (filling plain defaults for fields older documents lack) and serialize with
+# orjson, skipping model reconstruction and response_model validation.
+TRUSTED_READS = os.environ.get('TRUSTED_READS', '').lower() in ('1', 'true', 'yes')
+
+_response_fields: Dict[type, tuple] = {}
+
+def _fields_and_defaults(model) -> tuple:
+    if model not in _response_fields:
+        defaults = {name: field.default for name, field in model.model_fields.items()
+                    if not field.is_required() and field.default_factory is None}
+        _response_fields[model] = (tuple(model.model_fields), defaults)
+    return _response_fields[model]
+
+def read_response(documents, model=None, response: Optional[Response] = None, exclude_none: bool = False):
+    """Response for stored ``documents`` (a list or one document) as ``model``, or unchanged with no ``model``"""
+    if not TRUSTED_READS:
+        if model is None:
+            return documents
+        return [model(**document) for document in documents] if isinstance(documents, list) else model(**documents)
+    
+    if model is not None:
+        fields, defaults = _fields_and_defaults(model)
+        
+        def shape(document):
+            shaped = {}
+            for name in fields:
+                if name in document:
+                    value = document[name]
+                elif name in defaults:
+                    value = defaults[name]
+                else:
+                    continue
+                if value is not None or not exclude_none:
+                    shaped[name] = value
+            return shaped
+        
+        documents = [shape(document) for document in documents] if isinstance(documents, list) else shape(documents)
+    # Carry over the cursor list_page set on ``response``
+    headers = None
+    if response is not None and "X-Next-Cursor" in response.headers:
+        headers = {"X-Next-Cursor": response.headers["X-Next-Cursor"]}
+    return ORJSONResponse(documents, headers=headers)
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "Smart Classroom & Timetable Scheduler API"}
 
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes of this worker's reference data caches"""
+    return {name: cache.stats() for name, cache in reference_caches.items()}
+
 # Room Management
 @api_router.post("/rooms", response_model=Room)
 async def create_room(room_data: RoomCreate):
     room = Room(**room_data.dict())
     await db.rooms.insert_one(room.dict())
+    reference_caches["rooms"].invalidate()
+    await invalidate_generation_cache()
     return room
 
 @api_router.get("/rooms", response_model=List[Room])
-async def get_rooms():
-    rooms = await db.rooms.find({}, {"_id": 0}).to_list(100)
-    return [Room(**room) for room in rooms]
+async def get_rooms(response: Response, after: Optional[str] = None,
+                    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE), stream: bool = False):
+    if stream:
+        return stream_documents("rooms", {}, after, limit)
+    rooms = await list_page("rooms", {}, response, after, limit, cache=reference_caches["rooms"])
+    return read_response(rooms, Room, response)
 
 # Faculty Management
 @api_router.post("/faculty", response_model=Faculty)
 async def create_faculty(faculty_data: FacultyCreate):
     faculty = Faculty(**faculty_data.dict())
     await db.faculty.insert_one(faculty.dict())
+    reference_caches["faculty"].invalidate()
+    await invalidate_generation_cache(faculty.department)
     return faculty
 
 @api_router.get("/faculty", response_model=List[Faculty])
-async def get_faculty():
-    faculty_list = await db.faculty.find({}, {"_id": 0}).to_list(100)
-    return [Faculty(**faculty) for faculty in faculty_list]
+async def get_faculty(response: Response, after: Optional[str] = None,
+                      limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE), stream: bool = False):
+    if stream:
+        return stream_documents("faculty", {}, after, limit)
+    faculty_list = await list_page("faculty", {}, response, after, limit, cache=reference_caches["faculty"])
+    return read_response(faculty_list, Faculty, response)
 
 # Subject Management
 @api_router.post("/subjects", response_model=Subject)
 async def create_subject(subject_data: SubjectCreate):
     subject = Subject(**subject_data.dict())
     await db.subjects.insert_one(subject.dict())
+    reference_caches["subjects"].invalidate()
+    await invalidate_generation_cache(subject.department, subject.semester)
     return subject
 
 @api_router.get("/subjects", response_model=List[Subject])
-async def get_subjects():
-    subjects = await db.subjects.find({}, {"_id": 0}).to_list(100)
-    return [Subject(**subject) for subject in subjects]
+async def get_subjects(response: Response, after: Optional[str] = None,
+                       limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE), stream: bool = False):
+    if stream:
+        return stream_documents("subjects", {}, after, limit)
+    subjects = await list_page("subjects", {}, response, after, limit, cache=reference_caches["subjects"])
+    return read_response(subjects, Subject, response)
 
 @api_router.get("/subjects/department/{department}/semester/{semester}", response_model=List[Subject])
-async def get_subjects_by_dept_sem(department: str, semester: int):
-    subjects = await db.subjects.find({"department": department, "semester": semester}, {"_id": 0}).to_list(100)
-    return [Subject(**subject) for subject in subjects]
+async def get_subjects_by_dept_sem(department: str, semester: int, response: Response, after: Optional[str] = None,
+                                   limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE)):
+    subjects = await list_page("subjects", {"department": department, "semester": semester}, response,
+                               after, limit, cache=reference_caches["subjects"])
+    return read_response(subjects, Subject, response)
 
 # Batch Management
 @api_router.post("/batches", response_model=Batch)
 async def create_batch(batch_data: BatchCreate):
     batch = Batch(**batch_data.dict())
     await db.batches.insert_one(batch.dict())
+    await invalidate_generation_cache(batch.department, batch.semester)
     return batch
 
 @api_router.get("/batches", response_model=List[Batch])
-async def get_batches():
-    batches = await db.batches.find({}, {"_id": 0}).to_list(100)
-    return [Batch(**batch) for batch in batches]
+async def get_batches(response: Response, after: Optional[str] = None,
+                      limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE), stream: bool = False):
+    if stream:
+        return stream_documents("batches", {}, after, limit)
+    batches = await list_page("batches", {}, response, after, limit)
+    return read_response(batches, Batch, response)
 
 @api_router.get("/batches/department/{department}/semester/{semester}", response_model=List[Batch])
-async def get_batches_by_dept_sem(department: str, semester: int):
-    batches = await db.batches.find({"department": department, "semester": semester}, {"_id": 0}).to_list(100)
-    return [Batch(**batch) for batch in batches]
+async def get_batches_by_dept_sem(department: str, semester: int, response: Response, after: Optional[str] = None,
+                                  limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE)):
+    batches = await list_page("batches", {"department": department, "semester": semester}, response, after, limit)
+    return read_response(batches, Batch, response)
 
 # Timetable Generation
 @api_router.post("/timetables/generate/{department}/{semester}", response_model=Timetable)
-async def generate_timetable(department: str, semester: int):
-    timetable = await timetable_generator.generate_timetable(department, semester)
-    await db.timetables.insert_one(timetable.dict())
+async def generate_timetable(department: str, semester: int, engine: SolverEngine = SolverEngine.GREEDY,
+                             optimize_ms: int = Query(default=0, ge=0), seed: Optional[int] = None,
+                             diagnostics: bool = False):
+    timetable = await timetable_generator.generate_timetable(department, semester, engine=engine,
+                                                             optimize_ms=optimize_ms, seed=seed,
+                                                             diagnostics=diagnostics)
+    await save_timetable(timetable)
     return timetable
 
-@api_router.get("/timetables", response_model=List[Timetable])
-async def get_timetables():
-    timetables = await db.timetables.find({}, {"_id": 0}).to_list(100)
-    return [Timetable(**timetable) for timetable in timetables]
+@api_router.post("/timetables/generate-bulk")
+async def generate_timetables_bulk(request: BulkGenerateRequest):
+    """Generate timetables for many department/semester pairs in parallel worker processes"""
+    started = perf_counter()
+    targets = list(dict.fromkeys((t.department, t.semester) for t in request.targets))
+    inputs = await timetable_generator.fetch_inputs(targets)
+    
+    solvable = []
+    failed = []
+    for department, semester in targets:
+        try:
+            solvable.append((department, semester, *timetable_generator.check_inputs(inputs[(department, semester)])))
+        except HTTPException as exc:
+            failed.append({"department": department, "semester": semester, "detail": exc.detail})
+    
+    seeds = [await campus_occupancy.seed(tuple(target[:2])) for target in solvable]
+    timetables = list(await asyncio.gather(*[
+        run_in_process_pool(solve_department, *target, request.engine, occupancy, None,
+                            request.optimize_ms, request.seed)
+        for target, occupancy in zip(solvable, seeds)
+    ]))
+    
+    # Targets were solved independently; re-solve any that clash with an earlier
+    # target in the batch or, together with them, push a shared faculty member
+    # over an hour cap, this time with the earlier targets' bookings reserved
+    accepted = []
+    resolved = 0
+    for index, target in enumerate(solvable):
+        masks = CampusOccupancy.masks_for(timetables[index].entries)
+        if (any(masks_overlap(masks, earlier) for earlier in accepted) or
+                exceeds_faculty_caps(masks, accepted, seeds[index].faculty, target[4])):
+            occupancy = await campus_occupancy.seed(tuple(target[:2]), extra=tuple(accepted))
+            timetables[index] = await run_in_process_pool(solve_department, *target, request.engine, occupancy,
+                                                          None, request.optimize_ms, request.seed)
+            masks = CampusOccupancy.masks_for(timetables[index].entries)
+            resolved += 1
+        accepted.append(masks)
+    
+    if timetables:
+        await save_timetables(timetables)
+    
+    return {
+        "timetables": timetables,
+        "failed": failed,
+        "resolved_conflicts": resolved,
+        "elapsed_ms": round((perf_counter() - started) * 1000, 3)
+    }
+
+# Generation Jobs
+@api_router.post("/timetables/jobs", response_model=GenerationJob)
+async def create_generation_job(job_data: GenerationJobCreate):
+    """Queue a timetable generation and return immediately with the job id"""
+    job = GenerationJob(**job_data.dict())
+    await db.generation_jobs.insert_one(job.dict())
+    start_generation_job(job.id)
+    return job
+
+@api_router.get("/timetables/jobs/{job_id}", response_model=GenerationJob)
+async def get_generation_job(job_id: str):
+    job = await db.generation_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return read_response(job, GenerationJob)
+
+@api_router.post("/timetables/jobs/{job_id}/cancel", response_model=GenerationJob)
+async def cancel_generation_job(job_id: str):
+    """Cancel a queued job outright, or flag a running one to stop at its next progress check"""
+    cancelled_at = datetime.now(timezone.utc)
+    job = await db.generation_jobs.find_one_and_update(
+        {"id": job_id, "status": JobStatus.QUEUED.value},
+        {"$set": {"status": JobStatus.CANCELLED.value, "cancel_requested": True,
+                  "finished_at": cancelled_at}},
+        projection={"_id": 0},
+    )
+    if job:
+        job.update(status=JobStatus.CANCELLED.value, cancel_requested=True, finished_at=cancelled_at)
+    else:
+        job = await db.generation_jobs.find_one_and_update(
+            {"id": job_id},
+            {"$set": {"cancel_requested": True}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job_id in _job_cancel_events:
+        _job_cancel_events[job_id].set()
+    return GenerationJob(**job)
+
+TIMETABLE_SUMMARY_STAGES = [{"$project": {
+    "_id": 0, "id": 1, "name": 1, "department": 1, "semester": 1, "is_active": 1, "created_at": 1, "entry_count": 1,
+}}]
+TIMETABLE_WITH_ENTRIES_STAGES = [
+    {"$lookup": {"from": "timetable_entries", "localField": "id", "foreignField": "timetable_id", "as": "entries"}},
+    {"$project": {"_id": 0, "entries._id": 0, "entries.timetable_id": 0}},
+]
+
+@api_router.get("/timetables", response_model=List[TimetableSummary], response_model_exclude_none=True)
+async def get_timetables(response: Response, after: Optional[str] = None,
+                         limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE), stream: bool = False,
+                         include_entries: bool = False):
+    """Timetable summaries with entry counts; ``include_entries`` returns the full documents"""
+    stages = TIMETABLE_WITH_ENTRIES_STAGES if include_entries else TIMETABLE_SUMMARY_STAGES
+    if stream:
+        return stream_documents("timetables", {}, after, limit, stages=stages)
+    timetables = await list_page("timetables", {}, response, after, limit, stages=stages)
+    return read_response(timetables, TimetableSummary, response, exclude_none=True)
 
 @api_router.get("/timetables/{timetable_id}", response_model=Timetable)
 async def get_timetable(timetable_id: str):
-    timetable = await db.timetables.find_one({"id": timetable_id}, {"_id": 0})
+    timetable = await load_timetable(timetable_id)
     if not timetable:
         raise HTTPException(status_code=404, detail="Timetable not found")
-    return Timetable(**timetable)
+    return read_response(timetable, Timetable)
 
 @api_router.patch("/timetables/{timetable_id}/activate")
 async def activate_timetable(timetable_id: str):
     """Activate a timetable and deactivate others in same department/semester"""
-    timetable = await db.timetables.find_one({"id": timetable_id}, {"_id": 0})
+    timetable = await load_timetable(timetable_id)
     if not timetable:
         raise HTTPException(status_code=404, detail="Timetable not found")
     
-    # Deactivate other timetables in same department/semester
-    await db.timetables.update_many(
-        {"department": timetable["department"], "semester": timetable["semester"]},
-        {"$set": {"is_active": False}}
-    )
+    await set_active_timetable(timetable)
     
-    # Activate this timetable
-    await db.timetables.update_one(
-        {"id": timetable_id},
-        {"$set": {"is_active": True}}
-    )
+    if campus_occupancy.loaded:
+        campus_occupancy.set_scope(timetable["department"], timetable["semester"], timetable["entries"])
+    await campus_occupancy.changed()
+    await build_batch_views(timetable)
     
     return {"message": "Timetable activated successfully"}
 
+@api_router.post("/timetables/{timetable_id}/repair", response_model=Timetable)
+async def repair_timetable(timetable_id: str, delta: TimetableDelta):
+    """Re-solve only the entries affected by unavailable faculty/rooms or changed subjects"""
+    timetable = await load_timetable(timetable_id)
+    if not timetable:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    
+    scope = (timetable["department"], timetable["semester"])
+    inputs = await timetable_generator.fetch_inputs([scope])
+    batches, subjects, faculty, rooms = timetable_generator.check_inputs(inputs[scope])
+    occupancy = await campus_occupancy.seed(scope)
+    
+    repaired = timetable_generator.repair(timetable, batches, subjects, faculty, rooms, delta, occupancy)
+    
+    await replace_timetable_entries(timetable_id, repaired.entries, solver_stats=repaired.solver_stats)
+    if repaired.is_active:
+        if campus_occupancy.loaded:
+            campus_occupancy.set_scope(*scope, repaired.entries)
+        await campus_occupancy.changed()
+        await build_batch_views(repaired.dict())
+    
+    return repaired
+
 @api_router.delete("/timetables/clear/{department}/{semester}")
 async def clear_timetables(department: str, semester: int):
     """Clear all timetables for a specific department and semester"""
-    result = await db.timetables.delete_many({
+    deleted_count = await delete_timetables({
         "department": department, 
         "semester": semester
     })
+    campus_occupancy.clear_scope(department, semester)
+    await campus_occupancy.changed()
+    await db.batch_timetable_views.delete_many({"department": department, "semester": semester})
     
     return {
-        "message": f"Cleared {result.deleted_count} timetables for {department} Semester {semester}",
-        "deleted_count": result.deleted_count
+        "message": f"Cleared {deleted_count} timetables for {department} Semester {semester}",
+        "deleted_count": deleted_count
     }
 
 @api_router.delete("/timetables/clear-all")
 async def clear_all_timetables():
     """Clear all timetables from the system"""
     result = await db.timetables.delete_many({})
+    await db.timetable_entries.delete_many({})
+    await db.active_timetables.delete_many({})
+    campus_occupancy.clear()
+    await campus_occupancy.changed()
+    await db.batch_timetable_views.delete_many({})
     
     return {
         "message": f"Cleared all {result.deleted_count} timetables from the system",
@@ -421,46 +2363,96 @@ async def clear_all_timetables():
     }
 
 # Student Portal APIs
+async def enrich_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add subject, faculty and room names to entries; cache misses cost one query per collection"""
+    subjects, faculty, rooms = await asyncio.gather(
+        reference_caches["subjects"].get_many(e["subject_id"] for e in entries),
+        reference_caches["faculty"].get_many(e["faculty_id"] for e in entries),
+        reference_caches["rooms"].get_many(e["room_id"] for e in entries),
+    )
+    
+    enriched_entries = []
+    for entry in entries:
+        subject = subjects.get(entry["subject_id"])
+        faculty_member = faculty.get(entry["faculty_id"])
+        room = rooms.get(entry["room_id"])
+        
+        enriched_entries.append({
+            **entry,
+            "subject_name": subject["name"] if subject else "Unknown",
+            "subject_code": subject["code"] if subject else "N/A",
+            "faculty_name": faculty_member["name"] if faculty_member else "Unknown",
+            "room_name": room["name"] if room else "Unknown",
+            "room_type": room["room_type"] if room else "Unknown"
+        })
+    return enriched_entries
+
+async def build_batch_views(timetable: Dict[str, Any]):
+    """Write one pre-enriched student view per batch of an active timetable's department/semester"""
+    scope = {"department": timetable["department"], "semester": timetable["semester"]}
+    pointer = await db.active_timetables.find_one(scope, {"_id": 0, "timetable_id": 1, "version": 1})
+    if not pointer or pointer["timetable_id"] != timetable["id"]:
+        return
+    version = pointer.get("version", 0)
+    batches = await db.batches.find(scope, {"_id": 0}).to_list(None)
+    enriched = await enrich_entries(timetable["entries"])
+    entries_by_batch: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in enriched:
+        entries_by_batch.setdefault(entry["batch_id"], []).append(entry)
+    
+    views = []
+    for batch in batches:
+        entries = entries_by_batch.get(batch["id"], [])
+        views.append({
+            "batch_id": batch["id"],
+            "timetable_id": timetable["id"],
+            "version": version,
+            **scope,
+            "batch_info": batch,
+            "timetable": entries,
+            # Lets a change to any embedded document find the views to rebuild with one query
+            "subject_ids": sorted({e["subject_id"] for e in entries}),
+            "faculty_ids": sorted({e["faculty_id"] for e in entries}),
+            "room_ids": sorted({e["room_id"] for e in entries}),
+            "built_at": datetime.now(timezone.utc),
+        })
+    # Replace views in place so students never read an empty scope mid-rebuild; views of a newer
+    # activation are kept, so the last activation wins whichever rebuild finishes last
+    not_newer = {"version": {"$not": {"$gt": version}}}
+    try:
+        await db.batch_timetable_views.bulk_write(
+            [ReplaceOne({"batch_id": view["batch_id"], **not_newer}, view, upsert=True) for view in views]
+            + [DeleteMany({**scope, "batch_id": {"$nin": [view["batch_id"] for view in views]}, **not_newer})],
+            ordered=False
+        )
+    except BulkWriteError as exc:
+        # A newer activation's view already exists, so the upsert hit the unique batch_id index
+        if any(error["code"] != 11000 for error in exc.details["writeErrors"]):
+            raise
+
 @api_router.get("/student/timetable/{batch_id}")
 async def get_student_timetable(batch_id: str):
     """Get timetable for a specific batch (student view)"""
-    # Find active timetable for the batch
+    view = await db.batch_timetable_views.find_one({"batch_id": batch_id}, {"_id": 0})
+    if view:
+        return read_response({"timetable": view["timetable"], "batch_info": view["batch_info"]})
+    
+    # No view yet (e.g. activated before views existed): build the response from the timetable
     batch = await db.batches.find_one({"id": batch_id}, {"_id": 0})
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     
-    timetables = await db.timetables.find({
-        "department": batch["department"], 
-        "semester": batch["semester"],
-        "is_active": True
-    }, {"_id": 0}).to_list(10)
+    timetable_id = await active_timetable_id(batch["department"], batch["semester"])
     
-    if not timetables:
+    if not timetable_id:
         # Return empty timetable instead of error to allow graceful handling
-        return {"timetable": [], "batch_info": batch}
-    
-    timetable = timetables[0]
-    
-    # Filter entries for this batch and enrich with details
-    batch_entries = []
-    for entry in timetable["entries"]:
-        if entry["batch_id"] == batch_id:
-            # Get subject, faculty, and room details
-            subject = await db.subjects.find_one({"id": entry["subject_id"]}, {"_id": 0})
-            faculty = await db.faculty.find_one({"id": entry["faculty_id"]}, {"_id": 0})
-            room = await db.rooms.find_one({"id": entry["room_id"]}, {"_id": 0})
-            
-            enriched_entry = {
-                **entry,
-                "subject_name": subject["name"] if subject else "Unknown",
-                "subject_code": subject["code"] if subject else "N/A",
-                "faculty_name": faculty["name"] if faculty else "Unknown",
-                "room_name": room["name"] if room else "Unknown",
-                "room_type": room["room_type"] if room else "Unknown"
-            }
-            batch_entries.append(enriched_entry)
+        return read_response({"timetable": [], "batch_info": batch})
     
-    return {"timetable": batch_entries, "batch_info": batch}
+    entries = await db.timetable_entries.find(
+        {"timetable_id": timetable_id, "batch_id": batch_id}, ENTRY_PROJECTION
+    ).to_list(None)
+    batch_entries = await enrich_entries(entries)
+    return read_response({"timetable": batch_entries, "batch_info": batch})
 
 # Assignment Management
 @api_router.post("/assignments", response_model=Assignment)
@@ -470,14 +2462,37 @@ async def create_assignment(assignment_data: AssignmentCreate):
     return assignment
 
 @api_router.get("/assignments/batch/{batch_id}", response_model=List[Dict[str, Any]])
-async def get_assignments_for_batch(batch_id: str):
-    assignments = await db.assignments.find({"batch_id": batch_id}, {"_id": 0}).to_list(100)
+async def get_assignments_for_batch(batch_id: str, response: Response,
+                                    due_after: Optional[datetime] = None, due_before: Optional[datetime] = None,
+                                    after: Optional[str] = None,
+                                    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE)):
+    """A page of the batch's assignments ordered by due date, optionally limited to a due-date range"""
+    query: Dict[str, Any] = {"batch_id": batch_id}
+    due_date: Dict[str, datetime] = {}
+    if due_after:
+        due_date["$gte"] = due_after
+    if due_before:
+        due_date["$lte"] = due_before
+    if due_date:
+        query["due_date"] = due_date
+    if after:
+        query = after_due_date_cursor(query, after)
+    limit = limit or DEFAULT_PAGE_SIZE
+    assignments = await db.assignments.find(query, {"_id": 0}).sort(
+        [("due_date", 1), ("id", 1)]
+    ).to_list(limit + 1)
+    if len(assignments) > limit:
+        assignments = assignments[:limit]
+        response.headers["X-Next-Cursor"] = due_date_cursor(assignments[-1])
+    
+    # Enrich with subject and faculty details, one bulk lookup per collection
+    subjects = await reference_caches["subjects"].get_many(assignment["subject_id"] for assignment in assignments)
+    faculty_by_id = await reference_caches["faculty"].get_many(assignment["faculty_id"] for assignment in assignments)
     
-    # Enrich with subject and faculty details
     enriched_assignments = []
     for assignment in assignments:
-        subject = await db.subjects.find_one({"id": assignment["subject_id"]}, {"_id": 0})
-        faculty = await db.faculty.find_one({"id": assignment["faculty_id"]}, {"_id": 0})
+        subject = subjects.get(assignment["subject_id"])
+        faculty = faculty_by_id.get(assignment["faculty_id"])
         
         enriched_assignment = {
             **assignment,
@@ -487,22 +2502,137 @@ async def get_assignments_for_batch(batch_id: str):
         }
         enriched_assignments.append(enriched_assignment)
     
-    return enriched_assignments
+    return read_response(enriched_assignments, response=response)
+
+# Bulk Import
+MAX_IMPORT_ROWS = 10000
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    inserted_ids: List[str]
+    failed: List[Dict[str, Any]]
+
+def _csv_rows(text: str, create_model) -> List[Dict[str, Any]]:
+    """CSV rows as dicts; list fields are ``;``-separated and empty cells fall back to defaults"""
+    list_fields = {name for name, field in create_model.model_fields.items() if get_origin(field.annotation) is list}
+    rows = []
+    for row in csv.DictReader(io.StringIO(text)):
+        document = {}
+        for key, value in row.items():
+            if not key or value is None or not value.strip():
+                continue
+            key, value = key.strip(), value.strip()
+            document[key] = [item.strip() for item in value.split(";") if item.strip()] if key in list_fields else value
+        rows.append(document)
+    return rows
+
+async def _import_rows(request: Request, create_model) -> List[Any]:
+    """Rows from a JSON array body or a multipart CSV upload in the ``file`` field"""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Upload a CSV file in the 'file' field")
+        try:
+            text = (await upload.read()).decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV upload must be UTF-8 encoded")
+        rows = _csv_rows(text, create_model)
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or a CSV upload")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or a CSV upload")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_ROWS} rows per import")
+    return rows
+
+async def bulk_import(request: Request, collection_name: str, create_model, model) -> tuple:
+    """Validate and insert rows in one unordered ``insert_many``; returns (BulkImportResult, inserted models)"""
+    rows = await _import_rows(request, create_model)
+    # Failures are reported by zero-based row position without stopping the rest of the import
+    failed = []
+    documents = []
+    for row_number, row in enumerate(rows):
+        try:
+            if not isinstance(row, dict):
+                raise TypeError("row must be an object")
+            documents.append((row_number, model(**create_model(**row).dict())))
+        except ValidationError as exc:
+            failed.append({"row": row_number, "errors": [
+                {"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                for error in exc.errors()
+            ]})
+        except TypeError as exc:
+            failed.append({"row": row_number, "errors": [{"field": "", "message": str(exc)}]})
+    
+    inserted = [document for _, document in documents]
+    if documents:
+        try:
+            await db[collection_name].insert_many([document.dict() for document in inserted], ordered=False)
+        except BulkWriteError as exc:
+            rejected = {error["index"] for error in exc.details.get("writeErrors", [])}
+            for error in exc.details.get("writeErrors", []):
+                failed.append({"row": documents[error["index"]][0],
+                               "errors": [{"field": "", "message": error.get("errmsg", "write failed")}]})
+            inserted = [document for index, (_, document) in enumerate(documents) if index not in rejected]
+    
+    failed.sort(key=lambda failure: failure["row"])
+    return BulkImportResult(inserted=len(inserted), inserted_ids=[document.id for document in inserted],
+                            failed=failed), inserted
+
+@api_router.post("/rooms/bulk", response_model=BulkImportResult)
+async def import_rooms(request: Request):
+    """Create rooms from a JSON array or CSV upload; invalid rows are reported, not fatal"""
+    result, _ = await bulk_import(request, "rooms", RoomCreate, Room)
+    reference_caches["rooms"].invalidate()
+    await invalidate_generation_cache()
+    return result
+
+@api_router.post("/faculty/bulk", response_model=BulkImportResult)
+async def import_faculty(request: Request):
+    result, inserted = await bulk_import(request, "faculty", FacultyCreate, Faculty)
+    reference_caches["faculty"].invalidate()
+    for department in {faculty.department for faculty in inserted}:
+        await invalidate_generation_cache(department)
+    return result
+
+@api_router.post("/subjects/bulk", response_model=BulkImportResult)
+async def import_subjects(request: Request):
+    result, inserted = await bulk_import(request, "subjects", SubjectCreate, Subject)
+    reference_caches["subjects"].invalidate()
+    for department, semester in {(subject.department, subject.semester) for subject in inserted}:
+        await invalidate_generation_cache(department, semester)
+    return result
+
+@api_router.post("/batches/bulk", response_model=BulkImportResult)
+async def import_batches(request: Request):
+    result, inserted = await bulk_import(request, "batches", BatchCreate, Batch)
+    for department, semester in {(batch.department, batch.semester) for batch in inserted}:
+        await invalidate_generation_cache(department, semester)
+    return result
+
+@api_router.post("/assignments/bulk", response_model=BulkImportResult)
+async def import_assignments(request: Request):
+    result, _ = await bulk_import(request, "assignments", AssignmentCreate, Assignment)
+    return result
 
 # Faculty and Room Info APIs
 @api_router.get("/faculty/{faculty_id}", response_model=Faculty)
 async def get_faculty_details(faculty_id: str):
-    faculty = await db.faculty.find_one({"id": faculty_id}, {"_id": 0})
+    faculty = await reference_caches["faculty"].get(faculty_id)
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
-    return Faculty(**faculty)
+    return read_response(faculty, Faculty)
 
 @api_router.get("/rooms/{room_id}", response_model=Room)
 async def get_room_details(room_id: str):
-    room = await db.rooms.find_one({"id": room_id}, {"_id": 0})
+    room = await reference_caches["rooms"].get(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
-    return Room(**room)
+    return read_response(room, Room)
 
 # Initialize sample data endpoint
 @api_router.post("/init-sample-data")
@@ -515,6 +2645,8 @@ async def initialize_sample_data():
     await db.subjects.delete_many({})
     await db.batches.delete_many({})
     await db.assignments.delete_many({})
+    await db.batch_timetable_views.delete_many({})
+    await invalidate_generation_cache()
     
     # Sample Rooms
     rooms = [
@@ -525,8 +2657,7 @@ async def initialize_sample_data():
         Room(name="Auditorium", capacity=200, room_type="Auditorium", equipment=["Sound System", "Projector"])
     ]
     
-    for room in rooms:
-        await db.rooms.insert_one(room.dict())
+    await db.rooms.insert_many([room.dict() for room in rooms])
     
     # Sample Subjects
     subjects = [
@@ -542,10 +2673,8 @@ async def initialize_sample_data():
                 semester=3, subject_type=SubjectType.THEORY, hours_per_week=3)
     ]
     
-    subject_ids = []
-    for subject in subjects:
-        await db.subjects.insert_one(subject.dict())
-        subject_ids.append(subject.id)
+    await db.subjects.insert_many([subject.dict() for subject in subjects])
+    subject_ids = [subject.id for subject in subjects]
     
     # Sample Faculty
     faculty_list = [
@@ -559,8 +2688,7 @@ async def initialize_sample_data():
                 subjects=subject_ids[3:], max_hours_per_day=5, max_hours_per_week=22)
     ]
     
-    for faculty in faculty_list:
-        await db.faculty.insert_one(faculty.dict())
+    await db.faculty.insert_many([faculty.dict() for faculty in faculty_list])
     
     # Sample Batches
     batches = [
@@ -570,8 +2698,7 @@ async def initialize_sample_data():
               student_count=42, subjects=subject_ids)
     ]
     
-    for batch in batches:
-        await db.batches.insert_one(batch.dict())
+    await db.batches.insert_many([batch.dict() for batch in batches])
     
     # Sample Assignments
     assignments = [
@@ -587,20 +2714,120 @@ async def initialize_sample_data():
                   due_date=datetime(2025, 1, 20, 23, 59, 59, tzinfo=timezone.utc))
     ]
     
-    for assignment in assignments:
-        await db.assignments.insert_one(assignment.dict())
+    await db.assignments.insert_many([assignment.dict() for assignment in assignments])
+    
+    for cache in reference_caches.values():
+        cache.invalidate()
     
     return {"message": "Sample data initialized successfully"}
 
+# Request metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+ROUTE_HISTOGRAMS = {
+    "http_request_duration_seconds": ("Time to serve the request, streamed bodies included", LATENCY_BUCKETS),
+    "http_request_db_seconds": ("Time spent in Mongo commands per request", LATENCY_BUCKETS),
+    "http_request_db_queries": ("Mongo commands issued per request", QUERY_BUCKETS),
+}
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+# Keyed by (method, route template); counters additionally by status code
+route_histograms: Dict[tuple, Dict[str, Histogram]] = {}
+request_counts: Counter = Counter()
+
+def observe_request(method: str, route: str, status: int, seconds: float, metrics: RequestMetrics):
+    histograms = route_histograms.get((method, route))
+    if histograms is None:
+        histograms = route_histograms[(method, route)] = {
+            name: Histogram(buckets) for name, (_, buckets) in ROUTE_HISTOGRAMS.items()
+        }
+    histograms["http_request_duration_seconds"].observe(seconds)
+    histograms["http_request_db_seconds"].observe(metrics.db_seconds)
+    histograms["http_request_db_queries"].observe(metrics.queries)
+    request_counts[(method, route, status)] += 1
+
+class RequestMetricsMiddleware:
+    """Count each request's Mongo commands and time it"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started = perf_counter()
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                # Headers carry the totals so far; the histograms below see the whole body
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(metrics.queries)
+                headers["X-DB-Time-Ms"] = f"{metrics.db_seconds * 1000:.2f}"
+                headers["X-Response-Time-Ms"] = f"{(perf_counter() - started) * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_metrics.reset(token)
+            # Label by route template so ids in paths do not explode the series count
+            route = getattr(scope.get("route"), "path", "unmatched")
+            observe_request(scope["method"], route, status, perf_counter() - started, metrics)
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Per-route latency, Mongo time and query-count histograms for this worker, Prometheus format"""
+    lines = []
+    for name, (help_text, _) in ROUTE_HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route), histograms in sorted(route_histograms.items()):
+            lines += histograms[name].lines(name, f'method="{method}",route="{route}"')
+    lines += ["# HELP http_requests_total Requests served", "# TYPE http_requests_total counter"]
+    for (method, route, status), count in sorted(request_counts.items()):
+        lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(RequestMetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Time-Ms", "X-Response-Time-Ms"],
 )
 
 # Configure logging
@@ -610,6 +2837,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Index provisioning
+def _index(*fields: str, unique: bool = False) -> IndexModel:
+    return IndexModel([(field, ASCENDING) for field in fields], unique=unique)
+
+# Every query the API issues is covered by one of these
+INDEXES: Dict[str, List[IndexModel]] = {
+    "rooms": [_index("id", unique=True), _index("available")],
+    "faculty": [_index("id", unique=True), _index("department")],
+    "subjects": [_index("id", unique=True), _index("department", "semester")],
+    "batches": [_index("id", unique=True), _index("department", "semester")],
+    "assignments": [_index("id", unique=True), _index("batch_id", "due_date", "id")],
+    "timetables": [_index("id", unique=True), _index("department", "semester", "is_active")],
+    "timetable_entries": [
+        _index("timetable_id", "batch_id", "day"),
+        _index("faculty_id", "day", "start_time"),
+        _index("room_id", "day", "start_time"),
+    ],
+    "batch_timetable_views": [
+        _index("batch_id", unique=True),
+        _index("department", "semester"),
+        _index("subject_ids"),
+        _index("faculty_ids"),
+        _index("room_ids"),
+    ],
+    "active_timetables": [_index("department", "semester", unique=True), _index("timetable_id")],
+    "campus_occupancy_version": [_index("id", unique=True)],
+    "generation_jobs": [_index("id", unique=True), _index("status")],
+    "generation_cache": [_index("key", unique=True), _index("department", "semester")],
+}
+
+def _index_key(key) -> tuple:
+    return tuple((field, int(direction)) if isinstance(direction, (int, float)) else (field, direction)
+                 for field, direction in dict(key).items())
+
+async def ensure_indexes() -> List[str]:
+    """Create every declared index that is missing; returns the ones that could not be created"""
+    failed = []
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = {_index_key(info["key"]) for info in (await collection.index_information()).values()}
+        for model in models:
+            # Matched on key pattern, so an existing index is left alone whatever it is named
+            if _index_key(model.document["key"]) in existing:
+                continue
+            name = f"{collection_name}.{model.document['name']}"
+            logger.warning("Missing index %s; creating it", name)
+            try:
+                await collection.create_indexes([model])
+            except PyMongoError as exc:
+                logger.error("Could not create index %s: %s", name, exc)
+                failed.append(name)
+    return failed
+
+@app.on_event("startup")
+async def provision_indexes():
+    """Ensure indexes before serving; with STRICT_INDEXES set, refuse to start without them"""
+    failed = await ensure_indexes()
+    if failed and os.environ.get('STRICT_INDEXES', '').lower() in ('1', 'true', 'yes'):
+        raise RuntimeError(f"Missing indexes could not be created: {', '.join(failed)}")
+
+@app.on_event("startup")
+async def prepare_timetable_entries():
+    """Move any entries still embedded in timetable documents into timetable_entries"""
+    migrated = await migrate_embedded_entries()
+    if migrated:
+        logger.info("Moved embedded entries of %d timetables into timetable_entries", migrated)
+
+@app.on_event("startup")
+async def prepare_active_pointers():
+    """Give every scope with an active timetable its active_timetables pointer"""
+    created = await migrate_active_pointers()
+    if created:
+        logger.info("Created active timetable pointers for %d department/semester scopes", created)
+
+async def recover_generation_jobs(queued_before: Optional[datetime] = None) -> int:
+    """Requeue running jobs whose worker stopped heartbeating and start queued ones"""
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+    await db.generation_jobs.update_many(
+        {"status": JobStatus.RUNNING.value, "heartbeat_at": {"$lt": stale_before}, "cancel_requested": True},
+        {"$set": {"status": JobStatus.CANCELLED.value, "finished_at": now}}
+    )
+    requeued = await db.generation_jobs.update_many(
+        {"status": JobStatus.RUNNING.value, "heartbeat_at": {"$lt": stale_before}},
+        {"$set": {"status": JobStatus.QUEUED.value}}
+    )
+    if requeued.modified_count:
+        logger.warning("Requeued %d generation jobs with no heartbeat for %ds",
+                       requeued.modified_count, JOB_STALE_AFTER_SECONDS)
+    # Skip jobs queued after ``queued_before`` so a sweep does not race the worker that just queued them
+    query = {"status": JobStatus.QUEUED.value}
+    if queued_before is not None:
+        query["created_at"] = {"$lt": queued_before}
+    queued = await db.generation_jobs.find(query, {"_id": 0, "id": 1}).to_list(None)
+    # Claiming is atomic, so any number of API workers may sweep at once
+    for job in queued:
+        start_generation_job(job["id"])
+    return len(queued)
+
+async def sweep_generation_jobs():
+    """Periodically recover jobs orphaned by workers that died after startup"""
+    while True:
+        await asyncio.sleep(JOB_SWEEP_INTERVAL)
+        try:
+            queued_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_SWEEP_INTERVAL)
+            await recover_generation_jobs(queued_before)
+        except PyMongoError as exc:
+            logger.error("Generation job sweep failed: %s", exc)
+
+@app.on_event("startup")
+async def resume_generation_jobs():
+    """Requeue jobs orphaned by a dead worker, pick up anything still queued and keep sweeping"""
+    global _job_sweeper
+    resumed = await recover_generation_jobs()
+    if resumed:
+        logger.info("Resumed %d generation jobs", resumed)
+    _job_sweeper = asyncio.create_task(sweep_generation_jobs())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def shutdown_process_pool():
+    if _job_sweeper is not None:
+        _job_sweeper.cancel()
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+    if _job_manager is not None:
+        _job_manager.shutdown()
\ No newline at end of file
@@ -2,6 +2,8 @@ import React, { useState, useEffect } from 'react';
 import { Calendar, Users, BookOpen, MapPin, Clock, User, ChevronRight, CheckCircle, AlertCircle, Home, Settings, GraduationCap } from 'lucide-react';
 
 const API_BASE_URL = 'https://eduportal-77.preview.emergentagent.com/api';
+// Give up waiting on a generation job after this long
+const GENERATION_POLL_TIMEOUT_MS = 5 * 60 * 1000;
 
 const SmartClassroomApp = () => {
   const [currentPage, setCurrentPage] = useState('landing');
@@ -22,6 +24,7 @@ const SmartClassroomApp = () => {
   const [activeTab, setActiveTab] = useState('timetable');
   const [adminTab, setAdminTab] = useState('dashboard');
   const [notification, setNotification] = useState(null);
+  const [generationJob, setGenerationJob] = useState(null);
 
   // Show notification helper
   const showNotification = (message, type = 'success') => {
@@ -130,18 +133,42 @@ const SmartClassroomApp = () => {
   const generateTimetable = async () => {
     try {
       setIsLoading(true);
-      const response = await fetch(`${API_BASE_URL}/timetables/generate/${selectedDepartment}/${selectedSemester}`, {
-        method: 'POST'
+      const response = await fetch(`${API_BASE_URL}/timetables/jobs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ department: selectedDepartment, semester: Number(selectedSemester) })
       });
       
       if (response.ok) {
-        const data = await response.json();
-        showNotification(`Timetable generated successfully with ${data.entries.length} entries!`);
+        let job = await response.json();
+        setGenerationJob(job);
+        
+        // Poll the job until the solver finishes, fails or is cancelled, or we stop waiting
+        const deadline = Date.now() + GENERATION_POLL_TIMEOUT_MS;
+        while ((job.status === 'queued' || job.status === 'running') && Date.now() < deadline) {
+          await new Promise((resolve) => setTimeout(resolve, 1000));
+          const jobResponse = await fetch(`${API_BASE_URL}/timetables/jobs/${job.id}`);
+          if (!jobResponse.ok) {
+            throw new Error(`Job status request failed with ${jobResponse.status}`);
+          }
+          job = await jobResponse.json();
+          setGenerationJob(job);
+        }
         
-        // Activate the generated timetable
-        await fetch(`${API_BASE_URL}/timetables/${data.id}/activate`, {
-          method: 'PATCH'
-        });
+        if (job.status === 'queued' || job.status === 'running') {
+          showNotification('Timetable generation is taking too long; check the timetable list later', 'error');
+        } else if (job.status === 'completed') {
+          showNotification(`Timetable generated successfully with ${job.entries_placed} entries!`);
+          
+          // Activate the generated timetable
+          await fetch(`${API_BASE_URL}/timetables/${job.timetable_id}/activate`, {
+            method: 'PATCH'
+          });
+        } else if (job.status === 'cancelled') {
+          showNotification('Timetable generation cancelled', 'error');
+        } else {
+          showNotification(job.error || 'Error generating timetable', 'error');
+        }
         
         fetchAdminData();
       } else {
@@ -152,10 +179,23 @@ const SmartClassroomApp = () => {
       console.error('Error generating timetable:', error);
       showNotification('Error generating timetable', 'error');
     } finally {
+      setGenerationJob(null);
       setIsLoading(false);
     }
   };
 
+  const cancelGeneration = async () => {
+    if (!generationJob) return;
+    try {
+      await fetch(`${API_BASE_URL}/timetables/jobs/${generationJob.id}/cancel`, {
+        method: 'POST'
+      });
+    } catch (error) {
+      console.error('Error cancelling generation:', error);
+      showNotification('Error cancelling generation', 'error');
+    }
+  };
+
   const clearCurrentSchedule = async () => {
     try {
       setIsLoading(true);
@@ -533,6 +573,13 @@ const SmartClassroomApp = () => {
                   </select>
                 </div>
               </div>
+              {generationJob && (
+                <p className="text-sm text-gray-600 mb-4">
+                  Job {generationJob.status}: {generationJob.entries_placed} entries placed
+                  {generationJob.hours_unscheduled != null && `, ${generationJob.hours_unscheduled} hours still unscheduled`}
+                  {` (${(generationJob.elapsed_ms / 1000).toFixed(1)}s)`}
+                </p>
+              )}
               <div className="flex flex-wrap gap-4">
                 <button
                   onClick={generateTimetable}
@@ -541,6 +588,14 @@ const SmartClassroomApp = () => {
                 >
                   {isLoading ? 'Generating...' : 'Generate Timetable'}
                 </button>
+                {generationJob && (
+                  <button
+                    onClick={cancelGeneration}
+                    className="bg-gray-600 text-white px-6 py-3 rounded-lg hover:bg-gray-700 transition"
+                  >
+                    Cancel Generation
+                  </button>
+                )}
                 <button
                   onClick={clearCurrentSchedule}
                   disabled={isLoading}
@@ -575,7 +630,7 @@ const SmartClassroomApp = () => {
                         <h3 className="font-semibold text-gray-900">{timetable.name}</h3>
                         <p className="text-sm text-gray-600">
                           {timetable.department} - Semester {timetable.semester} 
-                          ({timetable.entries.length} entries)
+                          ({timetable.entry_count} entries)
                         </p>
                       </div>
                       <div className="flex items-center space-x-2">
@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# server.py reads these at import time; tests swap in an in-memory database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fresh in-memory database with the process-wide caches reset"""
+    database = AsyncMongoMockClient()["test_database"]
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "campus_occupancy", server.CampusOccupancy())
+    for cache in server.reference_caches.values():
+        cache.invalidate()
+    return database
+
+
+@pytest.fixture
+async def client(db):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as http_client:
+        yield http_client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shutdown_process_pool():
+    yield
+    if server._process_pool is not None:
+        server._process_pool.shutdown(cancel_futures=True)
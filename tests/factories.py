@@ -0,0 +1,35 @@
+"""In-memory departments and timetable assertions shared by the solver tests"""
+
+from collections import Counter
+
+from server import DayOfWeek
+
+
+def build_department(num_batches, num_subjects, hours_per_subject, faculty_per_subject, num_rooms,
+                     max_hours_per_day=6, max_hours_per_week=30):
+    """Every batch takes every subject; each subject has its own faculty, all rooms are classrooms"""
+    subjects = [{"id": f"sub-{i}", "name": f"Subject {i}", "code": f"S{i:02d}",
+                 "hours_per_week": hours_per_subject, "requires_lab": False}
+                for i in range(num_subjects)]
+    faculty = [{"id": f"fac-{i}-{j}", "name": f"Faculty {i}-{j}", "subjects": [f"sub-{i}"],
+                "max_hours_per_day": max_hours_per_day, "max_hours_per_week": max_hours_per_week}
+               for i in range(num_subjects) for j in range(faculty_per_subject)]
+    rooms = [{"id": f"room-{i}", "name": f"Room {i}", "room_type": "Classroom", "capacity": 60}
+             for i in range(num_rooms)]
+    batches = [{"id": f"batch-{i}", "name": f"Batch {i}", "student_count": 40,
+                "subjects": [subject["id"] for subject in subjects]}
+               for i in range(num_batches)]
+    return batches, subjects, faculty, rooms
+
+
+def entry_key(entry):
+    return (entry.batch_id, entry.subject_id, entry.faculty_id, entry.room_id,
+            DayOfWeek(entry.day).value, entry.start_time)
+
+
+def assert_no_clashes(entries):
+    for resource in ("batch_id", "faculty_id", "room_id"):
+        slots = Counter((getattr(entry, resource), DayOfWeek(entry.day).value, entry.start_time)
+                        for entry in entries)
+        clashes = [slot for slot, count in slots.items() if count > 1]
+        assert not clashes, f"{resource} double-booked: {clashes[:3]}"
@@ -0,0 +1,50 @@
+"""Timetable activation through the active pointer and materialized batch views"""
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def view_timetables(db):
+    views = await db.batch_timetable_views.find({}, {"_id": 0, "timetable_id": 1, "version": 1}).to_list(None)
+    return {(view["timetable_id"], view["version"]) for view in views}
+
+
+@pytest.fixture
+async def two_timetables(db, client):
+    await server.ensure_indexes()
+    await client.post("/init-sample-data")
+    first = (await client.post("/timetables/generate/Computer Science/3", params={"seed": 1})).json()["id"]
+    second = (await client.post("/timetables/generate/Computer Science/3", params={"seed": 2})).json()["id"]
+    return first, second
+
+
+async def test_views_follow_the_last_activation(db, client, two_timetables):
+    first, second = two_timetables
+    await client.patch(f"/timetables/{first}/activate")
+    await client.patch(f"/timetables/{second}/activate")
+    assert await view_timetables(db) == {(second, 2)}
+
+    # A rebuild for the first timetable that finishes after the pointer moved writes nothing
+    await server.build_batch_views(await server.load_timetable(first))
+    assert await view_timetables(db) == {(second, 2)}
+
+
+async def test_rebuild_that_read_an_older_pointer_does_not_overwrite_newer_views(db, client, two_timetables,
+                                                                                  monkeypatch):
+    first, second = two_timetables
+    await client.patch(f"/timetables/{first}/activate")
+    await client.patch(f"/timetables/{second}/activate")
+
+    # The first activation's rebuild read the pointer before the second activation moved it
+    async def stale_pointer(*args, **kwargs):
+        return {"timetable_id": first, "version": 1}
+    with monkeypatch.context() as patch:
+        patch.setattr(db.active_timetables, "find_one", stale_pointer)
+        await server.build_batch_views(await server.load_timetable(first))
+
+    assert await view_timetables(db) == {(second, 2)}
+    await client.patch(f"/timetables/{first}/activate")
+    assert await view_timetables(db) == {(first, 3)}
@@ -0,0 +1,40 @@
+"""Batch assignment listing"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from server import Assignment
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_assignments_page_in_due_date_order(db, client):
+    start = datetime(2026, 1, 5, 9, 0)
+    # Two assignments share each due date, so ties have to be broken by id
+    assignments = [Assignment(title=f"Assignment {i}", description="", subject_id="sub", faculty_id="fac",
+                              batch_id="batch", due_date=start + timedelta(days=i // 2))
+                   for i in range(7)]
+    await db.assignments.insert_many([assignment.dict() for assignment in reversed(assignments)])
+    expected = [assignment.id for assignment in sorted(assignments, key=lambda a: (a.due_date, a.id))]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"after": cursor} if cursor else {})}
+        response = await client.get("/assignments/batch/batch", params=params)
+        assert response.status_code == 200
+        seen += [assignment["id"] for assignment in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+    response = await client.get("/assignments/batch/batch", params={
+        "due_after": (start + timedelta(days=1)).isoformat(), "due_before": (start + timedelta(days=2)).isoformat(),
+    })
+    assert [assignment["id"] for assignment in response.json()] == expected[2:6]
+
+
+async def test_batch_assignments_reject_malformed_cursor(client):
+    response = await client.get("/assignments/batch/batch", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
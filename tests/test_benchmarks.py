@@ -0,0 +1,32 @@
+"""Smoke runs of the benchmark scripts"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / "backend" / "benchmarks"
+
+
+def test_generator_scaling_indexes_place_identical_entries():
+    # 9 h x 5 subjects overfills the week, so both runs must agree on what is left unscheduled too
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARKS_DIR / "generator_scaling.py"),
+         "--sizes", "3", "--repeat", "1", "--hours-per-subject", "9"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    batches, entries = result.stdout.splitlines()[1].split()[:2]
+    assert batches == "3" and 0 < int(entries) < 3 * 5 * 9
+
+
+def test_synthetic_campus_is_reproducible_from_its_seed(tmp_path):
+    outputs = []
+    for run in ("first", "second"):
+        subprocess.run(
+            [sys.executable, str(BENCHMARKS_DIR / "synthetic_campus.py"), "--departments", "2", "--semesters", "2",
+             "--seed", "4", "--output", str(tmp_path / run)],
+            check=True, capture_output=True, timeout=120,
+        )
+        outputs.append({path.name: path.read_text() for path in sorted((tmp_path / run).iterdir())})
+    assert outputs[0] == outputs[1]
+    assert "assignments.json" in outputs[0]
@@ -0,0 +1,59 @@
+"""Bulk import of reference data from JSON arrays and CSV uploads"""
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_invalid_rows_are_reported_and_valid_rows_inserted(db, client):
+    response = await client.post("/rooms/bulk", json=[
+        {"name": "Room 1", "capacity": 40, "room_type": "Classroom"},
+        {"name": "Room 2", "capacity": "lots", "room_type": "Classroom"},
+        "not an object",
+        {"name": "Room 4", "capacity": 60, "room_type": "Classroom"},
+    ])
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert [failure["row"] for failure in result["failed"]] == [1, 2]
+    assert result["failed"][0]["errors"][0]["field"] == "capacity"
+    assert sorted(room["name"] for room in await db.rooms.find().to_list(None)) == ["Room 1", "Room 4"]
+
+
+async def test_rows_rejected_by_the_database_are_reported_by_position(db, client, monkeypatch):
+    await server.ensure_indexes()
+    await db.rooms.insert_one({"id": "taken", "name": "Existing", "capacity": 10, "room_type": "Classroom"})
+    ids = iter(["first", "taken", "third"])
+    monkeypatch.setattr(server.uuid, "uuid4", lambda: next(ids))
+
+    response = await client.post("/rooms/bulk", json=[
+        {"name": f"Room {i}", "capacity": 40, "room_type": "Classroom"} for i in range(3)
+    ])
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted_ids"] == ["first", "third"]
+    assert [failure["row"] for failure in result["failed"]] == [1]
+    assert await db.rooms.count_documents({}) == 3
+
+
+async def test_csv_upload_splits_list_fields(db, client):
+    csv = "name,capacity,room_type,equipment\nLab A,30,Laboratory,Computers; Projector\n"
+
+    response = await client.post("/rooms/bulk", files={"file": ("rooms.csv", csv.encode(), "text/csv")})
+
+    assert response.json()["inserted"] == 1
+    room = await db.rooms.find_one({"name": "Lab A"})
+    assert room["capacity"] == 30 and room["equipment"] == ["Computers", "Projector"]
+
+
+async def test_non_utf8_csv_is_a_bad_request(db, client):
+    csv = "name,capacity,room_type\nSalle é,40,Classroom\n".encode("latin-1")
+
+    response = await client.post("/rooms/bulk", files={"file": ("rooms.csv", csv, "text/csv")})
+
+    assert response.status_code == 400
+    assert await db.rooms.count_documents({}) == 0
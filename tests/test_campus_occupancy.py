@@ -0,0 +1,49 @@
+"""Campus occupancy index shared by the API workers"""
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+SCOPE = ("Computer Science", 3)
+
+
+async def test_other_worker_reloads_after_activation_and_clear(db, client):
+    await server.ensure_indexes()
+    await client.post("/init-sample-data")
+    timetable = (await client.post("/timetables/generate/Computer Science/3", params={"seed": 1})).json()
+    # A second instance stands in for the index held by another API worker
+    other = server.CampusOccupancy()
+    await other.seed(("Mathematics", 1))
+    assert other.scopes == {}
+
+    await client.patch(f"/timetables/{timetable['id']}/activate")
+    occupancy = await other.seed(("Mathematics", 1))
+    assert other.scopes == {SCOPE: server.CampusOccupancy.masks_for(timetable["entries"])}
+    entry = timetable["entries"][0]
+    slot = server.timetable_generator.slot_lookup[(entry["day"], entry["start_time"])]
+    assert not occupancy.is_room_free(entry["room_id"], slot)
+
+    await client.delete("/timetables/clear/Computer Science/3")
+    await other.seed(("Mathematics", 1))
+    assert other.scopes == {}
+
+
+async def test_index_reloads_after_ttl_for_writes_outside_the_api(db, client):
+    await server.ensure_indexes()
+    await client.post("/init-sample-data")
+    timetable = (await client.post("/timetables/generate/Computer Science/3", params={"seed": 1})).json()
+    await client.patch(f"/timetables/{timetable['id']}/activate")
+    cached = server.CampusOccupancy(ttl_seconds=60)
+    await cached.seed(("Mathematics", 1))
+    assert SCOPE in cached.scopes
+
+    # Dropped straight from Mongo, so the version counter never moves
+    await db.active_timetables.delete_many({})
+    await cached.seed(("Mathematics", 1))
+    assert SCOPE in cached.scopes
+
+    cached.expires = 0.0
+    await cached.seed(("Mathematics", 1))
+    assert cached.scopes == {}
@@ -0,0 +1,48 @@
+"""Bulk generation across several department/semester targets"""
+
+from collections import Counter
+
+import pytest
+
+from server import Batch, DayOfWeek, Faculty, Room, Subject, SubjectType
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bulk_respects_hour_caps_of_faculty_shared_between_targets(db, client):
+    shared = Faculty(name="Shared", department="CS", max_hours_per_day=6, max_hours_per_week=10)
+    other = Faculty(name="Other", department="CS")
+    # Each batch best-fits its own room, so only the shared faculty member links the two targets
+    rooms = [Room(name="Room 40", capacity=40, room_type="Classroom"),
+             Room(name="Room 60", capacity=60, room_type="Classroom")]
+    subjects, batches = [], []
+    for semester, filler_hours, students in ((3, 0, 40), (5, 14, 60)):
+        subject = Subject(name=f"Subject {semester}", code=f"CS{semester}", department="CS", semester=semester,
+                          subject_type=SubjectType.THEORY, hours_per_week=8, faculty_ids=[shared.id])
+        shared.subjects.append(subject.id)
+        semester_subjects = [subject]
+        if filler_hours:
+            # Placed first, so semester 5 books the shared member later in the week than semester 3 does
+            filler = Subject(name=f"Filler {semester}", code=f"CF{semester}", department="CS", semester=semester,
+                             subject_type=SubjectType.THEORY, hours_per_week=filler_hours, faculty_ids=[other.id])
+            other.subjects.append(filler.id)
+            semester_subjects.insert(0, filler)
+        subjects += semester_subjects
+        batches.append(Batch(name=f"CS-{semester}", department="CS", semester=semester, student_count=students,
+                             subjects=[subject.id for subject in semester_subjects]))
+    for name, documents in (("faculty", [shared, other]), ("rooms", rooms), ("subjects", subjects),
+                            ("batches", batches)):
+        await db[name].insert_many([document.dict() for document in documents])
+
+    response = await client.post("/timetables/generate-bulk", json={
+        "targets": [{"department": "CS", "semester": 3}, {"department": "CS", "semester": 5}], "seed": 1,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolved_conflicts"] == 1
+    entries = [entry for timetable in body["timetables"] for entry in timetable["entries"]
+               if entry["faculty_id"] == shared.id]
+    assert len(entries) == 10
+    daily = Counter(DayOfWeek(entry["day"]) for entry in entries)
+    assert max(daily.values()) <= 6
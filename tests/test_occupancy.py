@@ -0,0 +1,25 @@
+"""SlotOccupancy bitmask index"""
+
+from server import SlotOccupancy
+
+
+def test_slot_occupancy_occupy_release_round_trip():
+    occupancy = SlotOccupancy()
+    occupancy.limit_faculty("fac", max_per_day=1, max_per_week=30, slots_per_day=7, num_days=6)
+    assert occupancy.is_free("batch", "fac", "room", 0)
+
+    occupancy.occupy("batch", "fac", "room", 0)
+    assert not occupancy.is_free("batch", "other-fac", "other-room", 0)
+    assert not occupancy.is_free("other-batch", "fac", "other-room", 0)
+    assert not occupancy.is_room_free("room", 0)
+    # The daily cap of one hour now blocks the rest of Monday but not Tuesday
+    assert not occupancy.is_free("other-batch", "fac", "other-room", 3)
+    assert occupancy.is_free("other-batch", "fac", "other-room", 7)
+
+    occupancy.release("batch", "fac", "room", 0)
+    assert occupancy.batches["batch"] == 0
+    assert occupancy.faculty["fac"] == 0
+    assert occupancy.rooms["room"] == 0
+    assert occupancy.faculty_load["fac"] == [0] * 6
+    assert occupancy.faculty_busy("fac") == 0
+    assert occupancy.is_free("other-batch", "fac", "other-room", 3)
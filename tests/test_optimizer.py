@@ -0,0 +1,50 @@
+"""Simulated-annealing improvement phase"""
+
+import random
+
+import pytest
+
+from server import DayOfWeek, RoomIndex, SlotOccupancy, TimetableGenerator, TimetableOptimizer
+from tests.factories import build_department
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return TimetableGenerator()
+
+
+def test_optimizer_running_cost_matches_fresh_score(generator):
+    batches, subjects, faculty, rooms = build_department(4, 5, 4, 2, 5)
+    faculty[0]["preferred_time_slots"] = ["09:00-13:15"]
+    rooms[0]["room_type"] = "Laboratory"
+    occupancy = SlotOccupancy()
+    timetable = generator.solve("Test", 1, batches, subjects, faculty, rooms, occupancy=occupancy, seed=1)
+    preferred = generator.apply_faculty_constraints(faculty, SlotOccupancy())
+
+    room_index = RoomIndex(rooms)
+    sessions = [
+        (entry.batch_id, entry.subject_id, entry.faculty_id, entry.room_id,
+         generator.slot_lookup[(DayOfWeek(entry.day).value, entry.start_time)], False,
+         room_index.candidates(False, 40, []))
+        for entry in timetable.entries
+    ]
+    slots_per_day = len(generator.time_slots) // len(DayOfWeek)
+    optimizer = TimetableOptimizer(occupancy, sessions, len(generator.time_slots), slots_per_day, preferred,
+                                   {room["id"]: room["room_type"] == "Laboratory" for room in rooms}, room_index,
+                                   rng=random.Random(5))
+
+    rng = random.Random(11)
+    cost = optimizer.score()["total"]
+    accepted = 0
+    for _ in range(3000):
+        session = rng.randrange(len(sessions))
+        if rng.random() < 0.7:
+            delta = optimizer._relocate(session, rng.randrange(len(generator.time_slots)), 1.0)
+        else:
+            delta = optimizer._swap(session, rng.choice(optimizer.by_batch[optimizer.batch[session]]), 1.0)
+        if delta is None:
+            continue
+        accepted += 1
+        cost += delta
+        assert cost == pytest.approx(optimizer.score()["total"])
+    assert accepted > 0
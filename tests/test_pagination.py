@@ -0,0 +1,48 @@
+"""Keyset pagination and NDJSON streaming of list endpoints"""
+
+import json
+
+import pytest
+
+from server import Batch, Room
+
+pytestmark = pytest.mark.anyio
+
+
+async def collect_pages(client, path, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"after": cursor} if cursor else {})}
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append([document["id"] for document in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+@pytest.mark.parametrize("path", ["/rooms", "/batches"])
+async def test_cursor_pages_cover_every_document_once_in_id_order(db, client, path):
+    documents = [Room(name=f"Room {i}", capacity=40, room_type="Classroom") for i in range(5)]
+    if path == "/batches":
+        documents = [Batch(name=f"Batch {i}", department="CS", semester=1, student_count=40) for i in range(5)]
+    await db[path.strip("/")].insert_many([document.dict() for document in documents])
+
+    pages = await collect_pages(client, path, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [document_id for page in pages for document_id in page] == sorted(document.id for document in documents)
+
+
+async def test_stream_returns_one_json_document_per_line(db, client):
+    rooms = [Room(name=f"Room {i}", capacity=40 + i, room_type="Classroom") for i in range(5)]
+    await db.rooms.insert_many([room.dict() for room in rooms])
+    ordered = sorted(rooms, key=lambda room: room.id)
+
+    response = await client.get("/rooms", params={"stream": True, "after": ordered[0].id, "limit": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [room.id for room in ordered[1:4]]
+    assert lines[0] == ordered[1].dict()
@@ -0,0 +1,28 @@
+"""Incremental repair of an existing timetable"""
+
+import pytest
+
+from server import SlotOccupancy, SolverEngine, TimetableDelta, TimetableGenerator
+from tests.factories import assert_no_clashes, build_department, entry_key
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return TimetableGenerator()
+
+
+def test_repair_keeps_untouched_entries_and_drops_removed_faculty(generator):
+    batches, subjects, faculty, rooms = build_department(3, 4, 4, 2, 4)
+    timetable = generator.solve("Test", 1, batches, subjects, faculty, rooms, engine=SolverEngine.CSP, seed=3)
+    removed = "fac-0-0"
+    assert any(entry.faculty_id == removed for entry in timetable.entries)
+
+    repaired = generator.repair(timetable.dict(), batches, subjects, faculty, rooms,
+                                TimetableDelta(unavailable_faculty_ids=[removed]), SlotOccupancy())
+
+    assert not repaired.solver_stats["widened"]
+    assert repaired.solver_stats["unscheduled_hours"] == 0
+    assert all(entry.faculty_id != removed for entry in repaired.entries)
+    untouched = {entry_key(entry) for entry in timetable.entries if entry.faculty_id != removed}
+    assert untouched <= {entry_key(entry) for entry in repaired.entries}
+    assert_no_clashes(repaired.entries)
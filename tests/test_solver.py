@@ -0,0 +1,29 @@
+"""CSP solver engine"""
+
+from collections import Counter
+
+import pytest
+
+from server import DayOfWeek, SolverEngine, TimetableGenerator
+from tests.factories import assert_no_clashes, build_department
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return TimetableGenerator()
+
+
+def test_csp_places_every_hour_of_a_tight_instance(generator):
+    # 3 batches x 28 h over 3 rooms; each faculty member is needed for 21 of their 21 weekly hours
+    batches, subjects, faculty, rooms = build_department(3, 4, 7, 1, 3, max_hours_per_day=4, max_hours_per_week=21)
+    timetable = generator.solve("Test", 1, batches, subjects, faculty, rooms, engine=SolverEngine.CSP)
+
+    assert timetable.solver_stats["unscheduled_hours"] == 0
+    assert Counter((entry.batch_id, entry.subject_id) for entry in timetable.entries) == {
+        (batch["id"], subject["id"]): 7 for batch in batches for subject in subjects
+    }
+    assert_no_clashes(timetable.entries)
+    weekly = Counter(entry.faculty_id for entry in timetable.entries)
+    daily = Counter((entry.faculty_id, DayOfWeek(entry.day).value) for entry in timetable.entries)
+    assert max(weekly.values()) <= 21
+    assert max(daily.values()) <= 4